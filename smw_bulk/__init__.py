@@ -0,0 +1,27 @@
+"""Shipment Grouping Tool processing engine."""
+from .engine import (
+    OUTPUT_MIME,
+    ManifestError,
+    build_workbook,
+    estimate_workbook,
+    output_filename,
+    process_manifest,
+    read_manifest,
+    validate_manifest,
+)
+from .sidecar import Sidecar
+from .team import TEAM_MEMBERS, Roster
+
+__all__ = [
+    "OUTPUT_MIME",
+    "TEAM_MEMBERS",
+    "ManifestError",
+    "Roster",
+    "Sidecar",
+    "build_workbook",
+    "estimate_workbook",
+    "output_filename",
+    "process_manifest",
+    "read_manifest",
+    "validate_manifest",
+]
@@ -0,0 +1,54 @@
+"""Vectorised column autofit shared by all sheets.
+
+Widths follow the original rule: the longest ``str(value)`` in the column
+or its header, plus 2, capped at 50.
+"""
+import numpy as np
+
+PADDING = 2
+MAX_WIDTH = 50
+
+# Missing values have always been measured as the text "nan".
+MISSING_LENGTH = len("nan")
+
+
+def text_lengths(frame):
+    """``len(str(value))`` for every cell, as a ``(rows, cols)`` int array."""
+    lengths = np.empty(frame.shape, dtype=np.int32)
+    for i in range(frame.shape[1]):
+        col = frame.iloc[:, i].astype(str).str.len()
+        lengths[:, i] = col.fillna(MISSING_LENGTH).to_numpy()
+    return lengths
+
+
+def max_lengths(lengths):
+    """Longest value per column, 0 for an empty frame."""
+    if len(lengths) == 0:
+        return [0] * lengths.shape[1]
+    return lengths.max(axis=0).tolist()
+
+
+def grouped_max_lengths(lengths, offsets):
+    """Longest value per column for each ``(start, stop)`` row range.
+
+    ``offsets`` must be ascending, back-to-back ranges such as the group
+    partitions of a sorted manifest. Returns one list per range from a
+    single ``np.maximum.reduceat`` over the array.
+    """
+    if not offsets:
+        return []
+    starts = [start for start, _ in offsets]
+    end = offsets[-1][1]
+    return np.maximum.reduceat(lengths[:end], starts, axis=0).tolist()
+
+
+def fit_widths(headers, lengths):
+    return [
+        min(max(len(str(h)), n) + PADDING, MAX_WIDTH)
+        for h, n in zip(headers, lengths)
+    ]
+
+
+def set_widths(ws, widths, first_col=0):
+    for i, width in enumerate(widths):
+        ws.set_column(first_col + i, first_col + i, width)
@@ -0,0 +1,167 @@
+"""Process several manifests at once into a single zip.
+
+Each manifest is processed on a bounded pool and its workbook is added to
+the zip as soon as it is done. The zip also holds a combined PO Summary of
+every input.
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .engine import SUMMARY_COLUMNS, output_filename, process_manifest
+from .layout import TEAM_COLORS, SheetPlan, team_style
+from .render import WorkbookRenderer
+
+# Manifests processed at the same time.
+BATCH_WORKERS = 4
+
+THREADS = "thread"
+PROCESSES = "process"
+
+POOLS = {
+    THREADS: ThreadPoolExecutor,
+    PROCESSES: ProcessPoolExecutor,
+}
+
+# How often ``on_progress`` hears from a batch while files are still running.
+BATCH_POLL_SECONDS = 0.5
+
+ZIP_MIME = "application/zip"
+COMBINED_SUMMARY = "Combined PO Summary.xlsx"
+COMBINED_COLUMNS = ["Source File"] + SUMMARY_COLUMNS
+
+# ``output`` is the zip as bytes or the path it was written to; ``errors``
+# maps each input that failed to its message; ``summary`` is the combined
+# PO Summary rows.
+BatchResult = namedtuple("BatchResult", "output files errors summary")
+
+
+def batch_filename(now=None):
+    """Timestamped zip name matching :func:`~smw_bulk.engine.output_filename`."""
+    return os.path.splitext(output_filename(now))[0] + ".zip"
+
+
+def workbook_name(name, used):
+    """``<input name>.xlsx``, numbered if another input already took it."""
+    stem = os.path.splitext(os.path.basename(name))[0] or "manifest"
+    candidate = stem + ".xlsx"
+    n = 2
+    while candidate in used or candidate == COMBINED_SUMMARY:
+        candidate = f"{stem} ({n}).xlsx"
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+class BatchStopped(Exception):
+    """Raised inside a file's processing once the batch has been stopped."""
+
+
+def _process_file(name, data, options, stop):
+    def check(done, total):
+        if stop.is_set():
+            raise BatchStopped(name)
+
+    summary = []
+    workbook = process_manifest(io.BytesIO(data), summary=summary, on_progress=check, **options)
+    return workbook, summary
+
+
+def plan_combined_summary(rows, colors=TEAM_COLORS):
+    """One sheet listing the PO Summary rows of every input file."""
+    plan = SheetPlan("PO Summary")
+    plan.write_row(0, 0, COMBINED_COLUMNS, "header")
+    for r, row in enumerate(rows, start=1):
+        values = [row[c] for c in COMBINED_COLUMNS]
+        plan.write_row(r, 0, values[:3], team_style(row["Assigned to"], colors))
+        plan.write_row(r, 3, values[3:5], "text")
+        plan.write(r, 5, row["Issues"], "red_fill" if row["Issues"] else "text")
+    for col, width in enumerate([40, 30, 18, 30, 10, 40]):
+        plan.set_column(col, col, width)
+    return plan
+
+
+def combined_summary_workbook(rows, colors=TEAM_COLORS):
+    buffer = io.BytesIO()
+    renderer = WorkbookRenderer(buffer)
+    renderer.render(plan_combined_summary(rows, colors))
+    renderer.close()
+    return buffer.getvalue()
+
+
+def process_batch(files, output=None, workers=BATCH_WORKERS, pool=THREADS, on_progress=None,
+                  **options):
+    """Process ``(name, bytes)`` manifests concurrently into one zip.
+
+    At most ``workers`` files are processed at a time on a ``pool``
+    ("thread" or "process"). ``on_progress(name, error, done, total)`` is
+    called from this thread as each file finishes, with ``error`` None on
+    success, and every ``BATCH_POLL_SECONDS`` while files are running, with
+    ``name`` None. Raising from it stops the batch: files not yet started
+    are cancelled and the running ones stop before their next PO sheet.
+    A file that fails is reported and left out; the others are still
+    zipped. ``options`` are passed to :func:`~smw_bulk.engine.process_manifest`.
+
+    The zip is written to ``output`` (a path or file object) or returned
+    as bytes in the :class:`BatchResult`.
+    """
+    if pool not in POOLS:
+        raise ValueError(f"Unknown pool {pool!r}; expected one of {sorted(POOLS)}.")
+    files = list(files)
+    target = io.BytesIO() if output is None else output
+
+    # Named in upload order so reruns give the same entries.
+    used = set()
+    entries = [workbook_name(name, used) for name, _ in files]
+
+    written, errors, rows = [], {}, {}
+    with contextlib.ExitStack() as stack:
+        if pool == PROCESSES:
+            stop = stack.enter_context(multiprocessing.Manager()).Event()
+        else:
+            stop = threading.Event()
+        zf = stack.enter_context(zipfile.ZipFile(target, "w", zipfile.ZIP_STORED))
+        executor = stack.enter_context(POOLS[pool](max_workers=max(1, workers)))
+        futures = {
+            executor.submit(_process_file, name, data, options, stop): (i, name)
+            for i, (name, data) in enumerate(files)
+        }
+        try:
+            done, pending = 0, set(futures)
+            while pending:
+                finished, pending = wait(pending, BATCH_POLL_SECONDS, FIRST_COMPLETED)
+                if not finished and on_progress is not None:
+                    on_progress(None, None, done, len(files))
+                for future in finished:
+                    done += 1
+                    i, name = futures[future]
+                    try:
+                        workbook, summary = future.result()
+                    except Exception as exc:  # one bad manifest must not sink the batch
+                        errors[name] = str(exc) or type(exc).__name__
+                    else:
+                        zf.writestr(entries[i], workbook)
+                        written.append(entries[i])
+                        rows[i] = [dict(row, **{"Source File": name}) for row in summary]
+                    if on_progress is not None:
+                        on_progress(name, errors.get(name), done, len(files))
+        except BaseException:
+            # Raised from on_progress (e.g. to cancel): drop the files not started
+            # yet and stop the running ones, so leaving the pool does not wait long.
+            stop.set()
+            for future in futures:
+                future.cancel()
+            raise
+
+        # Combined summary in upload order, whatever order the files finished in.
+        summary = [row for i in sorted(rows) for row in rows[i]]
+        roster = options.get("roster")
+        colors = roster.colors if roster is not None else TEAM_COLORS
+        zf.writestr(COMBINED_SUMMARY, combined_summary_workbook(summary, colors))
+
+    return BatchResult(target.getvalue() if output is None else output, written, errors, summary)
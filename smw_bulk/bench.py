@@ -0,0 +1,110 @@
+"""Benchmark the pipeline stage by stage on synthetic manifests.
+
+``python -m smw_bulk.bench --tiers small medium`` generates a manifest per
+size tier, processes it and prints the wall time of every stage; add
+``--memory`` for the peak Python allocation of each stage as well. This is
+a measuring tool, not a test: compare its numbers before and after a change
+to the hot loops.
+"""
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from .engine import process_manifest
+from .metrics import RunMetrics
+from .synthetic import synthetic_manifest, write_manifest
+
+# name -> (rows, POs, boxes per PO, distinct UPCs)
+TIERS = {
+    "small": (2_000, 50, 10, 100),
+    "medium": (20_000, 400, 20, 1_000),
+    "large": (100_000, 2_000, 20, 5_000),
+    "xlarge": (300_000, 5_000, 30, 20_000),
+}
+
+def run_stages(path, output, memory=False, constant_memory=False):
+    """Process the manifest at ``path`` into ``output`` and return its metrics.
+
+    The stages are the ones :func:`~smw_bulk.engine.process_manifest`
+    records (read, grouping, pivot, group_prep, write, close, ...); with
+    ``memory`` each also gets its peak traced allocation.
+    """
+    metrics = RunMetrics()
+    if memory:
+        tracemalloc.start()
+    try:
+        process_manifest(path, output, constant_memory=constant_memory, metrics=metrics)
+    finally:
+        if memory:
+            tracemalloc.stop()
+    result = metrics.as_dict()
+    result["output_bytes"] = os.path.getsize(output)
+    return result
+
+
+def run_tier(name, workdir, fmt="xlsx", seed=0, **options):
+    rows, pos, boxes, upcs = TIERS[name]
+    path = os.path.join(workdir, f"{name}.{fmt}")
+    if not os.path.exists(path):
+        write_manifest(synthetic_manifest(rows, pos, boxes_per_po=boxes, upcs=upcs, seed=seed), path)
+    result = run_stages(path, os.path.join(workdir, f"{name}_out.xlsx"), **options)
+    result.update(tier=name, rows=rows, pos=pos, input_bytes=os.path.getsize(path))
+    return result
+
+
+def format_result(result):
+    stages = result["stages"]
+    lines = [f"{result['tier']}: {result['rows']} rows, {result['groups']} POs, "
+             f"{stages['write']['cells']} cells, {result['output_bytes'] / 2 ** 20:.1f} MB out"]
+    for stage, entry in stages.items():
+        memory = ""
+        if "peak_traced_mb" in entry:
+            memory = f"  peak {entry['peak_traced_mb']:8.1f} MB"
+        elif "rss_delta_mb" in entry:
+            memory = (f"  RSS {entry['rss_delta_mb']:+8.1f} MB"
+                      f"  peak {entry['peak_rss_mb']:8.1f} MB")
+        lines.append(f"  {stage:<14} {entry['seconds']:8.3f} s{memory}")
+    lines.append(f"  {'total':<14} {result['seconds']:8.3f} s   max RSS {result['max_rss_mb']} MB")
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="smw_bulk.bench",
+        description="Time (and optionally memory-profile) each pipeline stage on synthetic manifests.",
+    )
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    parser.add_argument("--format", choices=["xlsx", "csv", "parquet"], default="xlsx",
+                        help="input format of the generated manifests")
+    parser.add_argument("--memory", action="store_true",
+                        help="trace peak allocations per stage (slows every stage down)")
+    parser.add_argument("--constant-memory", action="store_true")
+    parser.add_argument("--workdir", help="keep generated inputs and outputs here for reruns")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = dict(memory=args.memory, constant_memory=args.constant_memory)
+
+    with tempfile.TemporaryDirectory(prefix="smw_bulk_bench_") as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        results = []
+        for tier in args.tiers:
+            result = run_tier(tier, workdir, args.format, args.seed, **options)
+            print(format_result(result), flush=True)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
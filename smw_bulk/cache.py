@@ -0,0 +1,101 @@
+"""Bounded LRU cache of finished workbooks keyed by a hash of the upload."""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_key(data, *options):
+    """SHA-256 of the uploaded bytes plus any options that change the output."""
+    h = hashlib.sha256(data)
+    for opt in options:
+        h.update(b"\0")
+        h.update(repr(opt).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ResultCache:
+    """Thread-safe LRU of ``key -> bytes`` bounded by entry count and total size.
+
+    Streamlit serves every session from the same process, so one instance is
+    shared by all reruns and users of the page.
+
+    ``sizeof`` measures a value and ``on_evict`` is called with every value
+    that leaves the cache; see :meth:`for_files` for a cache of file paths.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 sizeof=len, on_evict=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_files(cls, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """Cache of paths to spilled workbooks, deleting files as they are evicted."""
+        return cls(max_entries, max_bytes, sizeof=os.path.getsize, on_evict=_remove_file)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                old = self._pop(key)
+                if old is not value and old != value:
+                    evicted.append(old)
+            size = self.sizeof(value)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._size += size
+            # The newest entry always stays, even if it alone exceeds max_bytes.
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                evicted.append(self._pop(next(iter(self._entries))))
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def _pop(self, key):
+        self._size -= self._sizes.pop(key)
+        return self._entries.pop(key)
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries.values())
+            self._entries.clear()
+            self._sizes.clear()
+            self._size = 0
+        if self.on_evict is not None:
+            for value in evicted:
+                self.on_evict(value)
@@ -0,0 +1,20 @@
+"""Vectorised conversion of frames and arrays into row lists for bulk writing.
+
+Frames are converted to text in one pass and handed to xlsxwriter a whole
+row at a time instead of cell by cell.
+"""
+
+
+def text_matrix(frame, blank_strings=()):
+    """Return ``frame`` as nested lists of ``str`` with missing values blank.
+
+    Any value equal to one of ``blank_strings`` (e.g. a literal ``"nan"``) is
+    blanked as well.
+    """
+    missing = frame.isna().to_numpy()
+    values = frame.astype(str).to_numpy(dtype=object)
+    values[missing] = ""
+    for s in blank_strings:
+        values[values == s] = ""
+    return values.tolist()
+
@@ -0,0 +1,164 @@
+"""Command-line entry point: ``python -m smw_bulk manifest.xlsx``."""
+import argparse
+import json
+import os
+import sys
+
+from .batch import BATCH_WORKERS, POOLS, THREADS, batch_filename, process_batch
+from .engine import (
+    CELL_STATUS,
+    STATUS_FORMULAS,
+    ManifestError,
+    output_filename,
+    process_manifest,
+    validate_manifest,
+)
+from .metrics import enable_logging
+from .sidecar import FORMATS, PARQUET, Sidecar
+from .store import GroupStore
+from .team import BALANCED, BLOCKS, Roster
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="smw_bulk",
+        description="Group a bulk shipment manifest into one sheet per PO.",
+    )
+    parser.add_argument(
+        "input", nargs="+",
+        help="manifest to process (.xlsx, .csv or .parquet); several are processed as a "
+             "batch into one zip",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="output workbook path or directory (default: timestamped name in the current directory)",
+    )
+    parser.add_argument(
+        "--constant-memory", action="store_true",
+        help="large-file mode: stream rows to disk instead of building the workbook in memory",
+    )
+    parser.add_argument(
+        "--pool", choices=sorted(POOLS), default=THREADS,
+        help="worker pool for the files of a batch (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--store", metavar="DIR",
+        help="incremental mode: reuse PO sheets and team assignments saved in DIR by earlier runs",
+    )
+    parser.add_argument(
+        "--roster", metavar="FILE",
+        help="JSON team roster: members with colours and capacities, workload weights, strategy",
+    )
+    parser.add_argument(
+        "--balance", action="store_true",
+        help="assign POs by workload (boxes and quantity) instead of in equal-count blocks",
+    )
+    parser.add_argument(
+        "--status-formula", choices=STATUS_FORMULAS, default=CELL_STATUS,
+        help="PO Summary Status formulas: 'cell' (original, volatile) or 'direct' "
+             "(non-volatile, faster to recalculate with thousands of POs)",
+    )
+    parser.add_argument(
+        "--sidecar", metavar="DIR",
+        help="also write box lines, pivots, dimensions and the PO summary as columnar "
+             "tables into DIR",
+    )
+    parser.add_argument(
+        "--sidecar-format", choices=FORMATS, default=PARQUET,
+        help="sidecar file format: Parquet or Arrow IPC (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-workers", type=int, default=BATCH_WORKERS,
+        help="manifests processed at the same time in a batch (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="log per-stage timing and memory figures as one JSON line per run on stderr",
+    )
+    parser.add_argument(
+        "--validate", action="store_true",
+        help="only run the dimension and shipment-letter checks and print a JSON report "
+             "(exit status 2 when issues are found); no workbook is written",
+    )
+    return parser
+
+
+def _output_path(output, default_name):
+    output = output or default_name
+    if os.path.isdir(output):
+        output = os.path.join(output, default_name)
+    return output
+
+
+def _roster(args):
+    strategy = BALANCED if args.balance else None
+    if args.roster:
+        return Roster.load(args.roster, strategy)
+    return Roster(strategy=strategy or BLOCKS)
+
+
+def run_batch(args):
+    output = _output_path(args.output, batch_filename())
+    files = []
+    for path in args.input:
+        with open(path, "rb") as fh:
+            files.append((path, fh.read()))
+
+    def report(name, error, done, total):
+        if name is None:  # still running
+            return
+        status = f"error: {error}" if error else "ok"
+        print(f"[{done}/{total}] {name}: {status}", file=sys.stderr)
+
+    result = process_batch(
+        files, output, workers=args.batch_workers, pool=args.pool, on_progress=report,
+        store=GroupStore(args.store) if args.store else None, roster=args.team,
+        status=args.status_formula,
+    )
+    print(output)
+    return 1 if result.errors else 0
+
+
+def run_single(args):
+    output = _output_path(args.output, output_filename())
+
+    sidecar = Sidecar() if args.sidecar else None
+    process_manifest(args.input, output, constant_memory=args.constant_memory,
+                     store=GroupStore(args.store) if args.store else None,
+                     roster=args.team, status=args.status_formula,
+                     sidecar=sidecar)
+
+    print(output)
+    if sidecar is not None:
+        for path in sidecar.write(args.sidecar, args.sidecar_format):
+            print(path)
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.metrics:
+        enable_logging(sys.stderr)
+
+    if len(args.input) > 1 and (args.validate or args.constant_memory or args.sidecar):
+        parser.error("--validate, --constant-memory and --sidecar take a single input")
+
+    try:
+        args.team = _roster(args)
+    except (OSError, ValueError) as exc:
+        print(f"error: roster: {exc}", file=sys.stderr)
+        return 1
+
+    try:
+        if len(args.input) > 1:
+            return run_batch(args)
+        args.input = args.input[0]
+        if args.validate:
+            report = validate_manifest(args.input)
+            print(json.dumps(report, indent=2))
+            return 0 if report["ok"] else 2
+        return run_single(args)
+    except (ManifestError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
@@ -0,0 +1,745 @@
+"""Headless processing engine for the Shipment Grouping Tool.
+
+Everything here runs without Streamlit so the same pipeline can be driven
+from the web page, the command line or a batch job.
+"""
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from .autofit import fit_widths, grouped_max_lengths, max_lengths, set_widths, text_lengths
+from .cells import text_matrix
+from .layout import TEAM_COLORS, SheetPlan, plan_stats, team_style
+from .metrics import RunMetrics
+from .pivot import UpcBoxPivots, box_numbers
+from .readers import ManifestError, read_header, read_table
+from .render import WorkbookRenderer
+from .store import group_key, row_hashes
+from .team import Roster
+from .validation import (
+    PO_COLUMN,
+    Validation,
+    dimension_columns,
+    dimension_flags,
+    group_keys,
+    missing_po_letters,
+    validation_report,
+)
+
+ORIGINAL_SHEET = "Original Data"
+PO_SUMMARY_SHEET = "PO Summary"
+
+# Fixed sheets ahead of the PO sheets, in tab order.
+SHEET_ORDER = [ORIGINAL_SHEET, PO_SUMMARY_SHEET]
+
+OUTPUT_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def process_po_number(po):
+    s = str(po)
+    if s and s[-1].isalpha():
+        return s[:-1]
+    return s
+
+
+def output_filename(now=None):
+    """Timestamped download name, e.g. ``SMW Bulk Shipments 2024-01-31 09-15-00 AM.xlsx``."""
+    if now is None:
+        now = datetime.now(pytz.timezone("America/Chicago"))
+    return "SMW Bulk Shipments " + now.strftime("%Y-%m-%d %I-%M-%S %p") + ".xlsx"
+
+
+def read_manifest(source, usecols=None):
+    """Read an .xlsx, .csv or .parquet manifest with every column as text.
+
+    Text keeps leading zeros; see :mod:`smw_bulk.readers` for the backends.
+    """
+    df = read_table(source, usecols=usecols)
+    if len(df.columns) < 3:
+        raise ManifestError("File needs at least 3 columns (A, B, C). Please check your file.")
+    return df
+
+
+def partition_groups(df):
+    """Order the manifest by group and shipment and partition it in one pass.
+
+    Returns ``(order, offsets, group_to_full_po)``. ``order`` holds the row
+    positions of ``df`` in sorted order and ``offsets`` maps each
+    ``group_15`` key, in sorted order, to the ``(start, stop)`` range of its
+    rows in ``order``, so a group's rows are ``df.take(order[start:stop])``.
+    ``group_to_full_po`` holds the first-seen full PO for each key.
+
+    Only integer codes of the keys are sorted; the manifest itself is never
+    copied in sorted order.
+    """
+    third_column = df.iloc[:, 2]
+    group_codes, groups = pd.factorize(group_keys(third_column), sort=True)
+    shipment_codes, _ = pd.factorize(group_keys(third_column, 16), sort=True)
+    # Rows with a blank PO sort last and belong to no group (see
+    # validation.blank_po); they are only on Original Data.
+    group_codes[group_codes < 0] = len(groups)
+    order = np.lexsort((shipment_codes, group_codes))
+
+    first_seen = np.flatnonzero(~pd.Series(group_codes).duplicated().to_numpy())
+    first_seen = first_seen[group_codes[first_seen] < len(groups)]
+    group_to_full_po = dict(zip(
+        groups[group_codes[first_seen]],
+        third_column.take(first_seen).map(str),
+    ))
+
+    # Rows of a group are contiguous once sorted, so each partition is a slice.
+    sorted_codes = group_codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes)) + 1
+    if len(order):
+        starts = np.concatenate(([0], starts))
+    stops = np.append(starts[1:], len(order))
+    offsets = {
+        groups[code]: (start, stop)
+        for code, start, stop in zip(sorted_codes[starts].tolist(), starts.tolist(), stops.tolist())
+        if code < len(groups)
+    }
+    return order, offsets, group_to_full_po
+
+
+def group_workloads(df, order, offsets, boxes):
+    """Boxes and total quantity of every group, as two arrays in ``offsets`` order.
+
+    ``order`` and ``offsets`` come from :func:`partition_groups` and
+    ``boxes`` is the Box# of every sorted row (see
+    :func:`~smw_bulk.pivot.box_numbers`); the quantity column is the one the
+    PO sheet totals use.
+    """
+    starts = [start for start, _ in offsets.values()]
+    if not starts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    end = list(offsets.values())[-1][1]
+    box_counts = np.maximum.reduceat(boxes[:end], starts)
+
+    qty_col = next((i for i, col in enumerate(df.columns)
+                    if "qty" in col.lower() or "quantity" in col.lower()), None)
+    if qty_col is None:
+        return box_counts, np.zeros(len(starts))
+    qty = pd.to_numeric(df.iloc[:, qty_col], errors="coerce").fillna(0).to_numpy()
+    return box_counts, np.add.reduceat(qty[order[:end]], starts)
+
+
+# -------------------------------------------------------------
+#                     ORIGINAL DATA SHEET
+# -------------------------------------------------------------
+def plan_original_sheet(df_original, data_lengths=None):
+    plan = SheetPlan(ORIGINAL_SHEET)
+    plan.set_tab_color('#000000')
+
+    # Write headers and data WITH BORDER
+    plan.write_row(0, 0, df_original.columns, "header")
+    plan.write_block(1, 0, df_original, "text")
+
+    # Autofit
+    if data_lengths is None:
+        data_lengths = max_lengths(text_lengths(df_original))
+    set_widths(plan, fit_widths(df_original.columns, data_lengths))
+    return plan
+
+
+# -------------------------------------------------------------
+#                    PROCESS EACH GROUP SHEET
+# -------------------------------------------------------------
+DIMENSION_HEADERS = [
+    "Box#", "Pkg Wt (Lbs)", "Pkg Length (in)",
+    "Pkg Width (in)", "Pkg Height (in)"
+]
+
+
+def number_boxes(group_df, boxes=None):
+    """A group's rows as on its PO sheet: Box# inserted as the second column
+    and the rows sorted by Box# and PO.
+
+    ``boxes`` is the Box# of every row, computed from the cartons when not
+    given. ``group_df`` is modified; the result's index is each row's
+    position in it.
+    """
+    # Positional index so the flags can follow the rows through the sort.
+    group_df.index = pd.RangeIndex(len(group_df))
+    if boxes is None:
+        boxes = box_numbers(group_df.iloc[:, 0], [(0, len(group_df))])
+    group_df.insert(1, "Box#", boxes)
+
+    box_col = group_df.columns[1]
+    po_col = group_df.columns[3]
+
+    group_df = group_df.sort_values(by=[box_col, po_col])
+    group_df[box_col] = group_df[box_col].astype(str)
+    return group_df
+
+
+def box_dimensions(group_df):
+    """One row per box with its weight and size, from a :func:`number_boxes` frame.
+
+    None when the manifest has no dimension columns.
+    """
+    dim_indices = [11, 12, 13, 14] if group_df.shape[1] >= 15 else []
+    if not dim_indices:
+        return None
+
+    box_idx = 1
+    selected = [box_idx] + dim_indices
+    dim_df = group_df.iloc[:, selected].copy()
+    dim_df.columns = DIMENSION_HEADERS
+
+    # Remove duplicates
+    dim_df = dim_df.drop_duplicates(subset=["Box#"], keep="first")
+
+    for c in dim_df.columns[1:]:
+        dim_df[c] = dim_df[c].fillna("").astype(str)
+
+    dim_df["Box#_sort"] = pd.to_numeric(dim_df["Box#"], errors="coerce") \
+                          .fillna(0).astype(int)
+    return dim_df.sort_values(by="Box#_sort").drop(columns=["Box#_sort"])
+
+
+def plan_group_sheet(group_df, sheet_name, person, data_lengths=None,
+                     dim_flags=None, missing_po=None, pivot=None, colors=TEAM_COLORS,
+                     boxes=None):
+    """Plan one PO sheet; returns ``(plan, excel_row)`` where ``excel_row`` is
+    the 1-based row of its workflow link cell.
+
+    ``data_lengths`` are the longest value lengths of the manifest columns in
+    this group, ``dim_flags`` the group's rows of
+    :func:`~smw_bulk.validation.dimension_flags` and ``missing_po`` whether
+    its shipment letters have a gap; ``pivot`` is the group's
+    :class:`~smw_bulk.pivot.BoxPivot` and ``boxes`` the Box# of its rows.
+    Each is computed from ``group_df`` when not supplied. ``colors`` maps
+    people to their tab colour.
+    """
+    if data_lengths is None:
+        data_lengths = max_lengths(text_lengths(group_df))
+    if pivot is None:
+        pivots = UpcBoxPivots.of_frame(group_df, {sheet_name: (0, len(group_df))})
+        if pivots is not None:
+            pivot = pivots.for_group(sheet_name)
+
+    dim_cols = dimension_columns(group_df.shape[1])
+    group_df = number_boxes(group_df, boxes)
+    po_col = group_df.columns[3]
+
+    # Manifest columns shift right by one on the sheet because of Box#.
+    sheet_dim_cols = [c + 1 for c in dim_cols]
+    if dim_flags is None:
+        dim_flags = dimension_flags(group_df.iloc[:, sheet_dim_cols])
+    else:
+        dim_flags = dim_flags[group_df.index.to_numpy()]
+    if missing_po is None:
+        missing_po = bool(missing_po_letters(group_df[po_col], [sheet_name] * len(group_df)))
+
+    ws = SheetPlan(sheet_name)
+    if person in colors:
+        ws.set_tab_color(colors[person])
+
+    # Write headers and values; blank or zero dimensions (columns L-O) and,
+    # when a shipment letter is missing, the PO column are red.
+    red = np.zeros(group_df.shape, dtype=np.int8)
+    red[:, sheet_dim_cols] = dim_flags
+    if missing_po:
+        red[:, 3] = 1
+    ws.write_row(0, 0, group_df.columns, "header")
+    ws.write_styled_rows(1, 0, text_matrix(group_df, blank_strings=("nan",)),
+                         red, ["text", "red_fill"])
+
+    # Autofit (Box# values are "1".."n")
+    total_boxes = group_df["Box#"].nunique()
+    box_length = len(str(total_boxes)) if total_boxes else 0
+    lengths = [data_lengths[0], box_length] + list(data_lengths[1:])
+    set_widths(ws, fit_widths(group_df.columns, lengths))
+
+    # -------------------------------------------------------------
+    # Totals section
+    # -------------------------------------------------------------
+    summary_start_row = len(group_df) + 3
+
+    qty_col = None
+    for col in group_df.columns:
+        if "qty" in col.lower() or "quantity" in col.lower():
+            qty_col = col
+            break
+
+    total_qty = (
+        pd.to_numeric(group_df[qty_col], errors="coerce").fillna(0).sum()
+        if qty_col else 0
+    )
+
+    ws.write(summary_start_row, 0, "Total Number of Boxes:", "header")
+    ws.write(summary_start_row, 1, str(int(total_boxes)), "bold_text")
+    ws.write(summary_start_row + 1, 0, "Total Quantity:", "header")
+    ws.write(summary_start_row + 1, 1, str(int(total_qty)), "bold_text")
+
+    # Workflow link
+    link_row = summary_start_row + 3
+    ws.write(link_row, 4, "Workflow Link:", "maroon_no_border")
+    ws.write(link_row, 5, "", "text")
+    excel_row = link_row + 1
+
+    ws.write_formula(
+        link_row, 6,
+        f'=IF(TRIM(F{excel_row})="","",HYPERLINK(F{excel_row},F{excel_row}))',
+        "text",
+    )
+
+    ws.set_column(5, 5, 80)
+    ws.set_column(6, 6, 120)
+
+    if missing_po:
+        ws.write(summary_start_row + 2, 0, "With Missing PO Number", "red_warning")
+
+    # Pivot
+    if pivot is not None:
+        start_col = 16
+        start_row = 0
+
+        ws.write_row(
+            start_row, start_col,
+            ["UPC"] + [f"Box {box}" for box in pivot.boxes] + ["Total"],
+            "dark_orange",
+        )
+
+        body = pivot.rows()
+        for r, upc in enumerate(pivot.upcs):
+            body[r].insert(0, str(upc))
+        ws.write_rows(start_row + 1, start_col, body, "text")
+        ws.write_column(start_row + 1, start_col + 1 + len(pivot.boxes),
+                        pivot.row_totals().tolist(), "bold_text")
+
+        total_row = start_row + 1 + len(pivot.upcs)
+        ws.write_row(
+            total_row, start_col,
+            ["Total"] + pivot.column_totals().tolist() + [pivot.grand_total()],
+            "dark_orange",
+        )
+
+        ws.set_column(start_col, start_col, 25)
+        for i in range(len(pivot.boxes) + 1):
+            ws.set_column(start_col + 1 + i, start_col + 1 + i, 12)
+
+        blank_col = start_col + 1 + len(pivot.boxes) + 1
+        ws.set_column(blank_col, blank_col, 3)
+
+        # Dimensions summary
+        dim_df = box_dimensions(group_df)
+
+        if dim_df is not None:
+            summary_start_col = blank_col + 1
+            summary_start_row = start_row
+
+            ws.write_row(summary_start_row, summary_start_col, dim_df.columns, "teal_header")
+            ws.write_rows(summary_start_row + 1, summary_start_col,
+                          text_matrix(dim_df), "text")
+
+            for c in range(len(dim_df.columns)):
+                ws.set_column(summary_start_col + c,
+                              summary_start_col + c,
+                              18)
+
+    return ws, excel_row
+
+
+# -------------------------------------------------------------
+#                  PO SUMMARY FINALIZATION
+# -------------------------------------------------------------
+# Status formula styles. "cell" reads the link through CELL("contents"),
+# which is volatile: Excel recalculates every status on any edit. "direct"
+# compares the link cell itself, so a status only recalculates when its
+# own link or issue changes. Both give the same three states.
+CELL_STATUS = "cell"
+DIRECT_STATUS = "direct"
+STATUS_FORMULAS = [CELL_STATUS, DIRECT_STATUS]
+
+
+def status_formula(excel_row, status=CELL_STATUS):
+    """PO Summary Status formula for a 1-based row (link in C, issues in D)."""
+    if status == DIRECT_STATUS:
+        return (
+            f'=IF(D{excel_row}<>"","WITH ISSUE",'
+            f'IF(C{excel_row}="","AWAITING UPLOAD","UPLOADED"))'
+        )
+    return (
+        f'=IF(AND(CELL("contents",C{excel_row})="",D{excel_row}=""),'
+        f'"AWAITING UPLOAD",'
+        f'IF(AND(CELL("contents",C{excel_row})="",D{excel_row}<>""),'
+        f'"WITH ISSUE",'
+        f'IF(AND(CELL("contents",C{excel_row})<>"",D{excel_row}<>""),'
+        f'"WITH ISSUE","UPLOADED")))'
+    )
+
+
+def plan_po_summary(po_summary_df, group_sheet_link_locations, colors=TEAM_COLORS,
+                    status=CELL_STATUS):
+    ws_po = SheetPlan(PO_SUMMARY_SHEET)
+    ws_po.set_tab_color('#000000')
+
+    ws_po.write(0, 0, "PO Number", "header")
+    ws_po.write(0, 1, "Assigned to", "header")
+    ws_po.write(0, 2, "Workflow Link", "header")
+    ws_po.write(0, 3, "Issues", "red_header")
+    ws_po.write(0, 4, "Status", "header")
+
+    for r in range(len(po_summary_df)):
+        po_num = str(po_summary_df.iloc[r, 0])
+        assigned = str(po_summary_df.iloc[r, 1])
+
+        excel_row = r + 2
+        row = r + 1
+
+        person_style = team_style(assigned, colors)
+        ws_po.write(row, 0, po_num, person_style)
+        ws_po.write(row, 1, assigned, person_style)
+
+        if po_num in group_sheet_link_locations:
+            sheet, glink_row = group_sheet_link_locations[po_num]
+            esc = sheet.replace("'", "''")
+            ws_po.write_formula(
+                row, 2,
+                f'=IF(TRIM(\'{esc}\'!F{glink_row})="","",'
+                f'HYPERLINK(\'{esc}\'!F{glink_row},\'{esc}\'!F{glink_row}))',
+                "text"
+            )
+        else:
+            ws_po.write(row, 2, "", "text")
+
+        ws_po.write(row, 3, "", "text")
+        ws_po.write_formula(row, 4, status_formula(excel_row, status), "text")
+
+    ws_po.conditional_format(
+        1, 4, len(po_summary_df), 4,
+        {"type": "text", "criteria": "containing",
+         "value": "UPLOADED", "format": "uploaded"}
+    )
+    ws_po.conditional_format(
+        1, 4, len(po_summary_df), 4,
+        {"type": "text", "criteria": "containing",
+         "value": "WITH ISSUE", "format": "red_fill"}
+    )
+    ws_po.conditional_format(
+        1, 4, len(po_summary_df), 4,
+        {"type": "text", "criteria": "containing",
+         "value": "AWAITING UPLOAD", "format": "awaiting_upload"}
+    )
+
+    ws_po.set_column(0, 0, 30)
+    ws_po.set_column(1, 1, 18)
+    ws_po.set_column(2, 2, 120)
+    ws_po.set_column(3, 3, 30)
+    ws_po.set_column(4, 4, 25)
+    return ws_po
+
+
+SUMMARY_COLUMNS = ["PO Number", "Assigned to", "Sheet", "Rows", "Issues"]
+
+
+def summary_row(po, person, sheet_name, rows, missing_po, bad_dimensions):
+    """One PO's line of a run summary, keyed by ``SUMMARY_COLUMNS``."""
+    issues = []
+    if missing_po:
+        issues.append("Missing PO letter")
+    if bad_dimensions:
+        issues.append("Blank or zero dimensions")
+    return dict(zip(SUMMARY_COLUMNS, [po, person or "", sheet_name, int(rows), "; ".join(issues)]))
+
+
+def iter_sheet_plans(df, store=None, metrics=None, summary=None, roster=None, on_progress=None,
+                     status=CELL_STATUS, sidecar=None):
+    """Yield a plan for every sheet of the workbook built from ``df``.
+
+    Original Data comes first, then each PO sheet, then PO Summary, whose
+    links point at rows of the PO sheets. Plans are produced one at a time
+    so a renderer can write each sheet before the next is planned.
+
+    ``store`` is an optional :class:`~smw_bulk.store.GroupStore`: PO sheets
+    saved by an earlier run for identical rows are reused instead of
+    replanned, and POs seen before keep their team member.
+
+    Stage timings and per-group figures are added to ``metrics`` (a
+    :class:`~smw_bulk.metrics.RunMetrics`) when given. ``summary``, if
+    given, is a list that receives one :func:`summary_row` per PO sheet.
+
+    ``roster`` (a :class:`~smw_bulk.team.Roster`) sets the team, their
+    colours and how POs are assigned; the default is the built-in team in
+    contiguous blocks.
+
+    ``on_progress(done, total)`` is called before each PO sheet is planned
+    and once all are done, with the number of PO sheets handed out so far.
+    Raising from it stops the run there.
+
+    ``status`` picks the PO Summary Status formulas (see ``STATUS_FORMULAS``).
+    A :class:`~smw_bulk.sidecar.Sidecar` given as ``sidecar`` is handed the
+    grouping, Box#, pivot and summary results for columnar export.
+    """
+    if status not in STATUS_FORMULAS:
+        raise ValueError(f"Unknown status formula {status!r}; expected one of {STATUS_FORMULAS}.")
+    if metrics is None:
+        metrics = RunMetrics()
+    if summary is None and sidecar is not None:
+        summary = []
+    if roster is None:
+        roster = Roster()
+
+    # The manifest stays in input order; groups are ranges of ``order``
+    # and only a group's own rows are ever taken out of it.
+    with metrics.stage("grouping", rows=len(df)):
+        order, offsets, group_to_full_po = partition_groups(df)
+    ranges = list(offsets.values())
+
+    # Measure every cell once; the original sheet and all group sheets size
+    # their columns from the same array.
+    with metrics.stage("autofit", cells=df.size):
+        lengths = text_lengths(df)
+        original_lengths = max_lengths(lengths)
+        group_lengths = dict(zip(offsets, grouped_max_lengths(lengths[order], ranges)))
+        del lengths
+
+    # Validation flags for every row and group in one pass.
+    with metrics.stage("validation", rows=len(df)):
+        validation = Validation.of_frame(df, order=order)
+
+    # UPC x Box# quantities for every group in one aggregation.
+    with metrics.stage("pivot"):
+        boxes = box_numbers(df.iloc[:, 0], ranges, order)
+        pivots = UpcBoxPivots.of_frame(df, offsets, boxes, order)
+    if pivots is not None:
+        metrics.count("pivot", cells=len(pivots.table))
+
+    with metrics.stage("original_sheet"):
+        plan = plan_original_sheet(df, original_lengths)
+    metrics.count("original_sheet", cells=plan.cell_count)
+    yield plan
+
+    # --- PO SUMMARY PREP ---
+    unique_pos_full = [group_to_full_po[g] for g in offsets]
+
+    processed_pos = []
+    seen = set()
+
+    for full in unique_pos_full:
+        proc = process_po_number(full)
+        if proc not in seen:
+            processed_pos.append(proc)
+            seen.add(proc)
+
+    unique_pos = sorted(processed_pos)
+
+    workloads = None
+    if roster.balanced:
+        with metrics.stage("assignment"):
+            box_counts, qty_totals = group_workloads(df, order, offsets, boxes)
+            workloads = {}
+            for g, n_boxes, qty in zip(offsets, box_counts.tolist(), qty_totals.tolist()):
+                proc = process_po_number(group_to_full_po[g])
+                workloads[proc] = workloads.get(proc, 0.0) + roster.workload(n_boxes, qty)
+    previous = store.assignments() if store is not None else None
+    assignments = roster.assign(unique_pos, workloads, previous)
+    if store is not None:
+        store.save_assignments(dict(zip(unique_pos, assignments)))
+
+    po_summary_df = pd.DataFrame({
+        "PO Number": unique_pos,
+        "Assigned to": assignments,
+        "Workflow Link": ["" for _ in range(len(unique_pos))],
+    })
+
+    po_to_person = {str(po_summary_df.iloc[i, 0]): str(po_summary_df.iloc[i, 1])
+                    for i in range(len(po_summary_df))}
+
+    group_sheet_link_locations = {}
+
+    groups_sorted = []
+    for g in offsets:
+        full_po = group_to_full_po[g]
+        proc_po = process_po_number(full_po)
+        groups_sorted.append((g, proc_po))
+    groups_sorted.sort(key=lambda x: x[1])
+
+    if sidecar is not None:
+        with metrics.stage("sidecar"):
+            sidecar.add_groups(df, order, offsets, boxes, pivots,
+                               {g: proc_po[:31] for g, proc_po in groups_sorted})
+
+    def plan_group(g, proc_po):
+        """Plan one PO sheet; returns ``((plan, excel_row), seconds)``."""
+        start, stop = offsets[g]
+        started = time.perf_counter()
+        result = plan_group_sheet(
+            df.take(order[start:stop]), proc_po[:31], po_to_person.get(proc_po),
+            data_lengths=group_lengths[g],
+            dim_flags=validation.dim_flags[start:stop],
+            missing_po=validation.has_missing_po(g),
+            pivot=pivots.for_group(g) if pivots is not None else None,
+            colors=roster.colors,
+            boxes=boxes[start:stop],
+        )
+        return result, time.perf_counter() - started
+
+    # With a store, only groups whose rows (or name or assignee) changed
+    # since a previous run are planned again.
+    keys = {}
+    if store is not None:
+        hashes = row_hashes(df)[order]
+        for g, proc_po in groups_sorted:
+            start, stop = offsets[g]
+            person = po_to_person.get(proc_po)
+            keys[g] = group_key(hashes[start:stop], df.columns, proc_po[:31],
+                                person, roster.colors.get(person))
+    stale_groups = {g for g, _ in groups_sorted if g not in keys or keys[g] not in store}
+
+    for done, (g, proc_po) in enumerate(groups_sorted):
+        if on_progress is not None:
+            on_progress(done, len(groups_sorted))
+        seconds = 0.0
+        with metrics.stage("group_prep"):
+            result = None if g in stale_groups else store.get(keys[g])
+            if result is None:  # stale, or removed or unreadable since it was looked up
+                result, seconds = plan_group(g, proc_po)
+                stale_groups.add(g)
+                if store is not None:
+                    store.put(keys[g], result)
+        plan, excel_row = result
+        start, stop = offsets[g]
+        metrics.count("group_prep", rows=stop - start, cells=plan.cell_count)
+        metrics.record_group(plan.name, prep_seconds=seconds, rows=stop - start,
+                             cells=plan.cell_count, reused=int(g not in stale_groups))
+        group_sheet_link_locations[proc_po] = (plan.name, excel_row)
+        if summary is not None:
+            summary.append(summary_row(
+                proc_po, po_to_person.get(proc_po), plan.name, stop - start,
+                validation.has_missing_po(g), validation.dim_flags[start:stop].any(),
+            ))
+        yield plan
+    if on_progress is not None:
+        on_progress(len(groups_sorted), len(groups_sorted))
+    if store is not None:
+        with metrics.stage("store_prune"):
+            store.prune()
+    if sidecar is not None:
+        sidecar.add_summary(summary)
+
+    with metrics.stage("summary", rows=len(po_summary_df)):
+        plan = plan_po_summary(po_summary_df, group_sheet_link_locations,
+                               colors=roster.colors, status=status)
+    yield plan
+
+
+def validate_manifest(source):
+    """Run the manifest checks without building a workbook.
+
+    Only the PO and dimension columns are read. Returns the report from
+    :func:`~smw_bulk.validation.validation_report`.
+    """
+    header = read_header(source)
+    if len(header) < 3:
+        raise ManifestError("File needs at least 3 columns (A, B, C). Please check your file.")
+    df = read_table(source, usecols=[PO_COLUMN] + dimension_columns(len(header)))
+    po = df.iloc[:, 0]
+
+    groups = group_keys(po)
+    first_seen = ~groups.duplicated() & groups.notna()
+    po_names = {
+        g: process_po_number(full)
+        for g, full in zip(groups[first_seen], po[first_seen].map(str))
+    }
+    return validation_report(po, df.iloc[:, 1:], po_names)
+
+
+def estimate_workbook(df):
+    """Sheet count, cell count and approximate size of the workbook, without writing it."""
+    return plan_stats(iter_sheet_plans(df))
+
+
+def build_workbook(df, output, constant_memory=False, store=None, metrics=None, summary=None,
+                   roster=None, on_progress=None, status=CELL_STATUS, sidecar=None):
+    """Run the grouping pipeline on ``df`` and write the workbook to ``output``.
+
+    With ``constant_memory`` xlsxwriter streams each sheet to a temporary file
+    row by row instead of keeping every cell in memory until close.
+    ``store``, ``metrics``, ``summary``, ``roster``, ``on_progress``,
+    ``status`` and ``sidecar`` are passed to
+    :func:`iter_sheet_plans`; the workbook itself is always written by this
+    thread, in sheet order.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    renderer = WorkbookRenderer(output, constant_memory=constant_memory)
+    for name in SHEET_ORDER:
+        renderer.reserve(name)
+    plans = iter_sheet_plans(df, store=store, metrics=metrics, summary=summary, roster=roster,
+                             on_progress=on_progress, status=status, sidecar=sidecar)
+    for plan in plans:
+        started = time.perf_counter()
+        with metrics.stage("write", cells=plan.cell_count):
+            renderer.render(plan)
+        if plan.name in metrics.groups:
+            metrics.record_group(plan.name, write_seconds=time.perf_counter() - started)
+    with metrics.stage("close"):
+        renderer.close()
+    return output
+
+
+def process_manifest(source, output=None, constant_memory=False, store=None, metrics=None,
+                     summary=None, roster=None, on_progress=None, status=CELL_STATUS,
+                     sidecar=None):
+    """Process a manifest end to end.
+
+    ``source`` is a path, a binary file object or a manifest already read
+    with :func:`read_manifest`. When ``output`` is a path the
+    workbook is written there and the path is returned; otherwise the
+    finished workbook is returned as bytes.
+
+    ``constant_memory`` is the large-file mode: the workbook is written row
+    by row and never held in memory as a whole. Without an ``output`` path it
+    is spilled to a temporary ``.xlsx`` file whose path is returned; the
+    caller owns that file.
+
+    ``store`` reuses unchanged PO sheets from earlier runs; see
+    :func:`iter_sheet_plans`.
+
+    Every run logs its stage timings as one JSON line on the
+    ``smw_bulk.metrics`` logger; pass a :class:`~smw_bulk.metrics.RunMetrics`
+    as ``metrics`` to inspect them afterwards. A ``summary`` list receives
+    one row per PO sheet (see :func:`summary_row`). ``roster`` sets the
+    team and assignment strategy (see :class:`~smw_bulk.team.Roster`).
+    ``on_progress(done, total)`` reports the PO sheets written so far; an
+    exception raised from it (e.g. to cancel) aborts the run, and a spilled
+    temporary file is removed. ``status="direct"`` writes non-volatile PO
+    Summary Status formulas (see :func:`status_formula`). A
+    :class:`~smw_bulk.sidecar.Sidecar` collects the same results as
+    columnar tables; write them with :meth:`~smw_bulk.sidecar.Sidecar.write`.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    with metrics.stage("read"):
+        df = source if isinstance(source, pd.DataFrame) else read_manifest(source)
+    metrics.count("read", rows=len(df), cells=df.size)
+
+    spilled = output is None and constant_memory
+    if spilled:
+        with tempfile.NamedTemporaryFile(prefix="smw_bulk_", suffix=".xlsx", delete=False) as fh:
+            output = fh.name
+    options = dict(store=store, metrics=metrics, summary=summary, roster=roster,
+                   on_progress=on_progress, status=status, sidecar=sidecar)
+    if output is None:
+        buffer = io.BytesIO()
+        build_workbook(df, buffer, **options)
+        result = buffer.getvalue()
+    else:
+        try:
+            build_workbook(df, output, constant_memory=constant_memory, **options)
+        except BaseException:
+            if spilled:
+                os.remove(output)
+            raise
+        result = output
+    metrics.finish()
+    metrics.log(rows=len(df), constant_memory=constant_memory)
+    return result
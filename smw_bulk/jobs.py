@@ -0,0 +1,190 @@
+"""Background jobs for the web page.
+
+Processing a large manifest can take minutes. A :class:`JobRunner` runs the
+work on a small thread pool and keeps a table of jobs keyed by the upload's
+:func:`~smw_bulk.cache.content_key`, so that:
+
+* a session only polls its job's progress and never waits on other users;
+* an identical upload while the first is still running joins that job
+  instead of starting the same work again;
+* a job can be cancelled; it stops before its next PO sheet.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Jobs running at the same time; later ones wait in the queue.
+JOB_WORKERS = 2
+
+# Finished jobs kept in the table for sessions that have not looked yet.
+FINISHED_JOBS = 32
+
+
+class JobCancelled(Exception):
+    """Raised from :meth:`Job.report` once the job has been cancelled."""
+
+
+class Job:
+    """One entry of the job table.
+
+    ``done``, ``total`` and ``text`` are the last progress reported by the
+    work and ``messages`` every status line it reported, in order;
+    ``result`` or ``error`` is set when it has finished. Work that puts its
+    output in a cache should return something small (e.g. the cache key),
+    since finished jobs stay in the table for a while.
+    """
+
+    def __init__(self, key, label=""):
+        self.key = key
+        self.label = label
+        self.state = QUEUED
+        self.done = 0
+        self.total = 0
+        self.text = ""
+        self.messages = []
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self.subscribers = set()
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def fraction(self):
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def cancelled(self):
+        """True once cancellation was requested, even if the work has not stopped yet."""
+        return self._cancel.is_set()
+
+    def report(self, done, total, text=None, message=None):
+        """Progress callback for the work; raises :class:`JobCancelled` when cancelled.
+
+        ``text`` replaces the progress text; ``message`` is a status line
+        kept in ``messages`` (e.g. one per file of a batch).
+        """
+        self.done, self.total = done, total
+        if text is not None:
+            self.text = text
+        if message is not None:
+            self.messages.append(message)
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+
+    def wait(self, timeout=None):
+        """Wait until the job has finished; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def _finish(self, state, result=None, error=None):
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        self._finished.set()
+
+
+class JobRunner:
+    """Thread pool plus a ``key -> Job`` table shared by every session.
+
+    Work runs in this process, so it can report progress and be cancelled
+    directly, and the GIL-heavy parts of different jobs interleave with
+    each other and with the page instead of one session holding up the rest.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, keep=FINISHED_JOBS):
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smw_bulk_job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def get(self, key):
+        return self._jobs.get(key)
+
+    def submit(self, key, fn, *args, label="", subscriber=None, **kwargs):
+        """Run ``fn(*args, on_progress=job.report, **kwargs)`` in the background.
+
+        If the job for ``key`` is queued, running or done, that job is
+        returned and ``fn`` is not called again. ``subscriber`` (e.g. a
+        session id) is recorded for :meth:`cancel`.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.state in (FAILED, CANCELLED):
+                job = Job(key, label)
+                self._jobs.pop(key, None)
+                self._jobs[key] = job
+                job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            if subscriber is not None:
+                job.subscribers.add(subscriber)
+        return job
+
+    def cancel(self, job, subscriber=None):
+        """Withdraw ``subscriber`` from the job and cancel it if nobody else waits for it.
+
+        Without a ``subscriber`` the job is cancelled outright. Returns True
+        if cancellation was requested.
+        """
+        with self._lock:
+            job.subscribers.discard(subscriber)
+            if job.state in FINISHED or (subscriber is not None and job.subscribers):
+                return False
+            job._cancel.set()
+            if job.future.cancel():  # still queued: it will never start
+                job._finish(CANCELLED)
+        return True
+
+    def forget(self, job):
+        """Drop a finished job from the table."""
+        with self._lock:
+            if job.state in FINISHED and self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def ahead_of(self, job):
+        """Number of unfinished jobs submitted before ``job``."""
+        with self._lock:
+            return sum(1 for other in self._jobs.values()
+                       if other.state not in FINISHED and other.submitted < job.submitted)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job._finish(CANCELLED)
+            self._trim()
+            return
+        job.state = RUNNING
+        job.started = time.time()
+        try:
+            result = fn(*args, on_progress=job.report, **kwargs)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as exc:
+            job._finish(FAILED, error=exc)
+        else:
+            job._finish(DONE, result=result)
+        self._trim()
+
+    def _trim(self):
+        with self._lock:
+            finished = [key for key, job in self._jobs.items() if job.state in FINISHED]
+            for key in finished[:max(0, len(finished) - self.keep)]:
+                del self._jobs[key]
+
+    def shutdown(self, wait=True):
+        """Cancel every unfinished job and stop the pool."""
+        for job in list(self._jobs.values()):
+            self.cancel(job)
+        self._executor.shutdown(wait=wait)
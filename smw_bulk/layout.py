@@ -0,0 +1,181 @@
+"""Pure-data layout plans for workbook sheets.
+
+Planning decides every cell, style, column width and conditional format of
+a sheet without touching xlsxwriter; :mod:`smw_bulk.render` turns a plan
+into a worksheet. Plans refer to styles by name (see ``STYLES``), so they
+can be inspected, counted, pickled or rendered elsewhere.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .autofit import text_lengths
+
+# A run of values written left to right from (row, col) in one style.
+Cells = namedtuple("Cells", "row col values style formula")
+
+# A whole frame written as text rows from (row, col). It is converted in
+# chunks at render time and must not share rows with any other item.
+Block = namedtuple("Block", "row col frame style blank_strings")
+
+_CENTER = {'align': 'center', 'valign': 'vcenter'}
+
+STYLES = {
+    "header": {
+        'bold': True, 'text_wrap': True, 'valign': 'vcenter', 'align': 'center',
+        'fg_color': '#4472C4', 'font_color': 'white', 'border': 1
+    },
+    "red_header": {
+        'bold': True, 'text_wrap': True, 'valign': 'vcenter', 'align': 'center',
+        'bg_color': '#FF0000', 'font_color': 'white', 'border': 1
+    },
+    "teal_header": {
+        'bold': True, 'text_wrap': True, 'valign': 'vcenter',
+        'align': 'center', 'fg_color': '#008080',
+        'font_color': 'white', 'border': 1
+    },
+    "dark_orange": {
+        'bold': True, 'text_wrap': True, 'valign': 'vcenter', 'align': 'center',
+        'fg_color': '#CC6600', 'font_color': 'white', 'border': 1
+    },
+    "maroon_no_border": {
+        'bold': True, 'align': 'center', 'valign': 'vcenter',
+        'fg_color': '#800000', 'font_color': 'white', 'border': 0
+    },
+    "text": dict(_CENTER, border=1, num_format='@', locked=False),
+    "bold_text": dict(_CENTER, border=1, bold=True, num_format='@'),
+    "red_fill": dict(_CENTER, border=1, bg_color='#FF0000', font_color='white'),
+    "red_warning": dict(_CENTER, border=1, bg_color='#FF0000', font_color='white', bold=True),
+    "uploaded": dict(_CENTER, border=1, bg_color='#FFFF00'),
+    "awaiting_upload": dict(_CENTER, border=1, bg_color='#FFA500'),
+}
+
+# Team colours: sheet tab and PO Summary cell fill per person.
+TEAM_COLORS = {
+    "Orville": "#FFFFE0",
+    "Stephanie": "#FFDAB9",
+    "Paulo": "#FFB6C1",
+    "JB": "#90EE90",
+    "Sunshine": "#ADD8E6",
+}
+
+_TEAM_STYLE_PREFIX = "team:"
+
+
+def team_style(person, colors=TEAM_COLORS):
+    """Style name for a person's PO Summary cells (plain text if they have no colour)."""
+    color = colors.get(person)
+    return _TEAM_STYLE_PREFIX + color if color else "text"
+
+
+def style_properties(name):
+    """xlsxwriter format properties for a style name."""
+    if name.startswith(_TEAM_STYLE_PREFIX):
+        return dict(STYLES["text"], bg_color=name[len(_TEAM_STYLE_PREFIX):])
+    return STYLES[name]
+
+
+# Rough per-cell XML overhead (<c r=".." s=".." t=".."><v>..</v></c>).
+_CELL_OVERHEAD = 30
+
+
+class SheetPlan:
+    """Everything needed to render one worksheet.
+
+    The write methods mirror the xlsxwriter worksheet API but take a style
+    name instead of a Format and only record what to write.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.tab_color = None
+        self.items = []
+        self.columns = []
+        self.conditional_formats = []
+
+    def set_tab_color(self, color):
+        self.tab_color = color
+
+    def set_column(self, first_col, last_col, width):
+        self.columns.append((first_col, last_col, width))
+
+    def write(self, row, col, value, style):
+        self.items.append(Cells(row, col, [value], style, False))
+
+    def write_row(self, row, col, values, style):
+        self.items.append(Cells(row, col, list(values), style, False))
+
+    def write_rows(self, row, col, rows, style):
+        for offset, values in enumerate(rows):
+            self.items.append(Cells(row + offset, col, values, style, False))
+
+    def write_styled_rows(self, row, col, rows, styles, style_names):
+        """Write rows whose cells may differ in style, each cell exactly once.
+
+        ``styles`` is an int array shaped like ``rows`` indexing into
+        ``style_names``; each run of equal styles in a row becomes one item.
+        """
+        uniform = (styles == styles[:, :1]).all(axis=1) if styles.size else []
+        for offset, values in enumerate(rows):
+            codes = styles[offset]
+            if uniform[offset]:
+                self.items.append(Cells(row + offset, col, values, style_names[codes[0]], False))
+                continue
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            start = 0
+            for stop in bounds.tolist() + [len(values)]:
+                self.items.append(Cells(row + offset, col + start, values[start:stop],
+                                        style_names[codes[start]], False))
+                start = stop
+
+    def write_column(self, row, col, values, style):
+        for offset, value in enumerate(values):
+            self.items.append(Cells(row + offset, col, [value], style, False))
+
+    def write_formula(self, row, col, formula, style):
+        self.items.append(Cells(row, col, [formula], style, True))
+
+    def write_block(self, row, col, frame, style, blank_strings=()):
+        self.items.append(Block(row, col, frame, style, tuple(blank_strings)))
+
+    def conditional_format(self, first_row, first_col, last_row, last_col, options):
+        """``options["format"]`` is a style name."""
+        self.conditional_formats.append((first_row, first_col, last_row, last_col, options))
+
+    def ordered_items(self):
+        """Items sorted by row; items on the same row keep their call order."""
+        return sorted(self.items, key=lambda item: item.row)
+
+    def styles(self):
+        names = {item.style for item in self.items}
+        names.update(cf[4]["format"] for cf in self.conditional_formats)
+        return names
+
+    @property
+    def cell_count(self):
+        return sum(
+            item.frame.size if isinstance(item, Block) else len(item.values)
+            for item in self.items
+        )
+
+    def estimated_bytes(self):
+        """Approximate uncompressed size of the sheet's cell XML."""
+        total = 0
+        for item in self.items:
+            if isinstance(item, Block):
+                total += int(text_lengths(item.frame).sum()) + _CELL_OVERHEAD * item.frame.size
+            else:
+                total += sum(len(str(v)) + _CELL_OVERHEAD for v in item.values)
+        return total
+
+
+def plan_stats(plans):
+    """Sheet, cell and size totals for an iterable of plans, before rendering."""
+    stats = {"sheets": 0, "cells": 0, "estimated_bytes": 0, "styles": set()}
+    for plan in plans:
+        stats["sheets"] += 1
+        stats["cells"] += plan.cell_count
+        stats["estimated_bytes"] += plan.estimated_bytes()
+        stats["styles"] |= plan.styles()
+    stats["styles"] = len(stats["styles"])
+    return stats
@@ -0,0 +1,194 @@
+"""Per-run timing, memory and size figures for each pipeline stage.
+
+A :class:`RunMetrics` is filled in by :func:`~smw_bulk.engine.process_manifest`
+as it goes and summarised with :meth:`RunMetrics.as_dict`, which the app
+shows in an expander and :meth:`RunMetrics.log` writes as one JSON line on
+the ``smw_bulk.metrics`` logger. That logger has no handler of its own;
+:func:`enable_logging` gives it one (the app and ``--metrics`` do), or
+configure logging as usual, e.g. ``logging.basicConfig(level=logging.INFO)``.
+
+Memory figures are for the whole process. When several runs overlap (the
+app's job runner, a threaded batch), each run's stages also count the
+memory the others allocate at the same time; only a run on its own gets
+figures that belong to it alone.
+"""
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("smw_bulk.metrics")
+
+# Groups listed in the summary, slowest first.
+SLOWEST_GROUPS = 10
+
+# How often a stage samples resident memory for its peak.
+SAMPLE_SECONDS = 0.01
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rounded(figures):
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in figures.items()}
+
+
+def enable_logging(stream=None, level=logging.INFO):
+    """Write the per-run JSON lines to ``stream`` (default stderr), once per process."""
+    if not any(getattr(h, "_smw_bulk", False) for h in logger.handlers):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._smw_bulk = True
+        logger.addHandler(handler)
+    logger.setLevel(level)
+
+
+def rss_mb():
+    """Current resident memory of this process, or None where it cannot be read cheaply."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            resident = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident * _PAGE_SIZE / 2 ** 20
+
+
+def max_rss_mb():
+    """High-water resident memory of this process so far, or None if unknown.
+
+    This is a lifetime peak: in a long-running process it only ever grows.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+class _PeakSampler(threading.Thread):
+    """Polls :func:`rss_mb` until stopped and keeps the highest reading."""
+
+    def __init__(self, first):
+        super().__init__(name="smw-bulk-rss", daemon=True)
+        self.peak = first
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(SAMPLE_SECONDS):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+class RunMetrics:
+    """Stages and per-group figures of one run.
+
+    Every stage records its wall time, the resident memory when it ended
+    (``rss_mb``) and how much that grew or shrank during the stage
+    (``rss_delta_mb``), where the platform reports it, and the highest
+    resident memory seen while it ran (``peak_rss_mb``). The peak comes from
+    sampling every :data:`SAMPLE_SECONDS` and, when the process's lifetime
+    peak grew during the stage, from ``ru_maxrss``, which catches spikes
+    shorter than a sample. While :mod:`tracemalloc` is tracing, a stage
+    also records the peak traced allocation. A stage entered more than
+    once adds up its time, memory change and counts and keeps the highest
+    peak.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.groups = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @contextmanager
+    def stage(self, name, **counts):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        max_before = max_rss_mb()
+        rss_before = rss_mb()
+        sampler = None
+        if rss_before is not None:
+            sampler = _PeakSampler(rss_before)
+            sampler.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"seconds": 0.0})
+            entry["seconds"] += time.perf_counter() - started
+            peak = sampler.stop() if sampler is not None else None
+            rss_after = rss_mb()
+            if rss_after is not None:
+                peak = max(peak, rss_after)
+                entry["rss_mb"] = round(rss_after, 1)
+                entry["rss_delta_mb"] = round(
+                    entry.get("rss_delta_mb", 0.0) + rss_after - rss_before, 1)
+            max_after = max_rss_mb()
+            if max_after is not None and max_after > max_before:
+                peak = max_after if peak is None else max(peak, max_after)
+            if peak is not None:
+                entry["peak_rss_mb"] = max(entry.get("peak_rss_mb", 0.0), round(peak, 1))
+            if tracing:
+                peak = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+                entry["peak_traced_mb"] = max(entry.get("peak_traced_mb", 0.0), peak)
+            self.count(name, **counts)
+
+    def count(self, name, **counts):
+        """Add ``rows``, ``cells`` or other counts to a stage."""
+        entry = self.stages.setdefault(name, {"seconds": 0.0})
+        for key, value in counts.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def record_group(self, name, **figures):
+        """Add seconds or counts (``prep_seconds``, ``write_seconds``, ``cells``...) to a PO sheet."""
+        entry = self.groups.setdefault(name, {})
+        for key, value in figures.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def slowest_groups(self, n=SLOWEST_GROUPS):
+        """The ``n`` PO sheets with the most prep plus write time, slowest first."""
+        def seconds(name):
+            figures = self.groups[name]
+            return figures.get("prep_seconds", 0) + figures.get("write_seconds", 0)
+
+        return [
+            dict(_rounded(self.groups[name]), sheet=name, seconds=round(seconds(name), 4))
+            for name in heapq.nlargest(n, self.groups, key=seconds)
+        ]
+
+    def as_dict(self, slowest=SLOWEST_GROUPS):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        stages = {name: _rounded(entry) for name, entry in self.stages.items()}
+        rss = rss_mb()
+        return {
+            "seconds": round(end - self.started, 4),
+            "rss_mb": None if rss is None else round(rss, 1),
+            "max_rss_mb": max_rss_mb(),
+            "groups": len(self.groups),
+            "stages": stages,
+            "slowest_groups": self.slowest_groups(slowest),
+        }
+
+    def to_json(self, **extra):
+        return json.dumps(dict(self.as_dict(), **extra), sort_keys=True, default=str)
+
+    def log(self, level=logging.INFO, **extra):
+        """Write the summary (plus ``extra`` fields) as a single JSON log line."""
+        logger.log(level, "%s", self.to_json(**extra))
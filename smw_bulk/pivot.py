@@ -0,0 +1,183 @@
+"""UPC x Box# quantity pivots for every PO, aggregated in one pass.
+
+The manifest is summed once on ``(group_15, UPC, Box#)``. The result is kept
+in long (sparse) form, one row per non-empty cell, sorted by group, so a PO
+sheet's pivot is a slice of it and never a mostly-zero dense frame.
+"""
+import numpy as np
+import pandas as pd
+
+# The pivot only looks at the first ten PO sheet columns: manifest columns
+# A-I plus the inserted Box#.
+PIVOT_SOURCE_COLUMNS = 9
+
+
+def pivot_columns(columns):
+    """Positions of the UPC and quantity columns used by the pivot, or None.
+
+    As on the PO sheets, the last of the first nine manifest columns whose
+    name contains "upc", and the last containing "qty" or "quantity".
+    """
+    upc = qty = None
+    for i, col in enumerate(columns[:PIVOT_SOURCE_COLUMNS]):
+        lc = col.lower()
+        if "upc" in lc: upc = i
+        if "qty" in lc or "quantity" in lc: qty = i
+    if upc is None or qty is None:
+        return None
+    return upc, qty
+
+
+def box_numbers(cartons, offsets, order=None):
+    """Box# of every row of a manifest sorted into contiguous groups.
+
+    ``cartons`` is the carton column in sorted order or, when the sorted row
+    positions ``order`` are given, in input order. Cartons are numbered
+    1..n within each ``(start, stop)`` range in order of first appearance;
+    a missing carton counts as one more carton.
+    """
+    carton_codes, carton_uniques = pd.factorize(cartons, use_na_sentinel=False)
+    if order is not None:
+        carton_codes = carton_codes[order]
+    box = np.zeros(len(carton_codes), dtype=np.int64)
+    if not offsets:
+        return box
+    end = offsets[-1][1]
+    sizes = [stop - start for start, stop in offsets]
+    group_ids = np.repeat(np.arange(len(offsets)), sizes)
+    carton_codes = carton_codes[:end]
+    # First-appearance codes of (group, carton) pairs are consecutive within
+    # a group, so each group's Box# is its codes shifted to start at 1.
+    pair_codes, _ = pd.factorize(group_ids * len(carton_uniques) + carton_codes)
+    starts = np.repeat(pair_codes[[start for start, _ in offsets]], sizes)
+    box[:end] = pair_codes - starts + 1
+    return box
+
+
+def quantities(values):
+    """Row quantities as the pivot counts them: numeric, else 0, truncated to int."""
+    return pd.to_numeric(values, errors="coerce").fillna(0).astype(int).to_numpy()
+
+
+class BoxPivot:
+    """One PO's pivot in sparse form.
+
+    ``upcs`` and ``boxes`` are the sorted row and column labels; ``cells`` is
+    ``(upc_index, box_index, qty)`` for every non-empty cell.
+    """
+
+    def __init__(self, upcs, boxes, upc_index, box_index, qty):
+        self.upcs = upcs
+        self.boxes = boxes
+        self.cells = (upc_index, box_index, qty)
+
+    @property
+    def shape(self):
+        return len(self.upcs), len(self.boxes)
+
+    def row_totals(self):
+        upc_index, _, qty = self.cells
+        totals = np.zeros(len(self.upcs), dtype=np.int64)
+        np.add.at(totals, upc_index, qty)
+        return totals
+
+    def column_totals(self):
+        _, box_index, qty = self.cells
+        totals = np.zeros(len(self.boxes), dtype=np.int64)
+        np.add.at(totals, box_index, qty)
+        return totals
+
+    def grand_total(self):
+        return int(self.cells[2].sum())
+
+    def rows(self):
+        """Body rows as lists, ``""`` for empty or zero cells."""
+        out = [[""] * len(self.boxes) for _ in self.upcs]
+        for r, c, q in zip(*(a.tolist() for a in self.cells)):
+            if q:
+                out[r][c] = q
+        return out
+
+    def to_frame(self):
+        """Dense ``UPC x Box#`` frame, as ``pd.pivot_table`` would return it."""
+        dense = np.zeros(self.shape, dtype=np.int64)
+        dense[self.cells[0], self.cells[1]] = self.cells[2]
+        return pd.DataFrame(dense, index=pd.Index(self.upcs, name="UPC"),
+                            columns=pd.Index(self.boxes, name="Box#"))
+
+
+class UpcBoxPivots:
+    """The ``(group, UPC, Box#) -> qty`` sums of a whole manifest.
+
+    ``table`` has one row per non-empty cell, sorted by group, UPC and Box#;
+    ``offsets`` maps each group to its ``(start, stop)`` rows in ``table``.
+    """
+
+    def __init__(self, table, offsets):
+        self.table = table
+        self.offsets = offsets
+
+    @classmethod
+    def aggregate(cls, groups, upcs, boxes, qty):
+        """Sum quantities per ``(group, UPC, Box#)``; rows without a UPC are skipped.
+
+        ``groups`` may be a :class:`pandas.Categorical`, whose category order
+        is then the group order.
+        """
+        frame = pd.DataFrame({
+            "group": groups,
+            "upc": pd.array(upcs, copy=False),
+            "box": np.asarray(boxes),
+            "qty": np.asarray(qty),
+        })
+        frame = frame[frame["upc"].notna().to_numpy()]
+        table = frame.groupby(["group", "upc", "box"], sort=True, observed=True)["qty"] \
+            .sum().reset_index()
+        positions = table.groupby("group", sort=False, observed=True).indices
+        offsets = {g: (int(idx[0]), int(idx[-1]) + 1) for g, idx in positions.items()}
+        return cls(table, offsets)
+
+    @classmethod
+    def of_frame(cls, df, offsets, boxes=None, order=None):
+        """Pivots of a manifest partitioned into the ``offsets`` group ranges.
+
+        The ranges are of ``df``'s rows or, when the sorted row positions
+        ``order`` are given, of ``order`` (see
+        :func:`~smw_bulk.engine.partition_groups`). ``boxes`` is the
+        :func:`box_numbers` of the sorted rows, if already known. Returns
+        None when the manifest has no UPC or quantity column.
+        """
+        columns = pivot_columns(df.columns)
+        if columns is None:
+            return None
+        upc, qty = columns
+        ranges = list(offsets.values())
+        end = ranges[-1][1] if ranges else 0
+        if order is None:
+            order = np.arange(len(df))
+        if boxes is None:
+            boxes = box_numbers(df.iloc[:, 0], ranges, order)
+        rows = order[:end]
+        # Groups as integer codes; only the group names are strings.
+        groups = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(ranges)), [stop - start for start, stop in ranges]),
+            categories=list(offsets),
+        )
+        return cls.aggregate(
+            groups,
+            df.iloc[:, upc].take(rows).array,
+            boxes[:end],
+            quantities(df.iloc[:, qty].take(rows)),
+        )
+
+    def __contains__(self, group):
+        return group in self.offsets
+
+    def for_group(self, group):
+        """The group's :class:`BoxPivot`; empty if none of its rows has a UPC."""
+        start, stop = self.offsets.get(group, (0, 0))
+        part = self.table.iloc[start:stop]
+        upc_index, upcs = pd.factorize(part["upc"], sort=True)
+        box_index, boxes = pd.factorize(part["box"], sort=True)
+        return BoxPivot(list(upcs), boxes.tolist(), upc_index, box_index,
+                        part["qty"].to_numpy())
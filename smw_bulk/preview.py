@@ -0,0 +1,108 @@
+"""Browse the PO groups of a manifest without building the workbook.
+
+A :class:`ManifestIndex` is built once per upload: the manifest is grouped
+and validated and every group's rows, boxes and quantity are counted, all
+in whole-manifest passes. A PO's own sheet rows, Box# numbering, pivot and
+dimensions table are only worked out when that PO is previewed.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .cells import text_matrix
+from .engine import (
+    SUMMARY_COLUMNS,
+    box_dimensions,
+    group_workloads,
+    number_boxes,
+    partition_groups,
+    process_po_number,
+    read_manifest,
+    summary_row,
+)
+from .pivot import UpcBoxPivots, box_numbers
+from .validation import Validation, dimension_columns
+
+INDEX_COLUMNS = ["PO Number", "Sheet", "Rows", "Boxes", "Quantity", "Issues"]
+
+# ``rows`` is the PO sheet's data as text, Box# included, and ``flags`` is a
+# bool array over it marking the cells the sheet colours red. ``pivot`` is
+# the UPC x Box# quantities with totals and ``dimensions`` one row per box;
+# either is None when the manifest lacks the columns for it.
+GroupPreview = namedtuple(
+    "GroupPreview", "po sheet rows flags pivot dimensions boxes quantity missing_letters"
+)
+
+
+def pivot_frame(pivot):
+    """A :class:`~smw_bulk.pivot.BoxPivot` as a frame laid out like the PO sheet."""
+    frame = pivot.to_frame()
+    frame.columns = [f"Box {box}" for box in pivot.boxes]
+    frame["Total"] = pivot.row_totals()
+    frame.loc["Total"] = pivot.column_totals().tolist() + [pivot.grand_total()]
+    return frame
+
+
+class ManifestIndex:
+    """The PO groups of a parsed manifest, one line each, in sheet order.
+
+    ``table`` has the ``INDEX_COLUMNS`` of every PO sheet the workbook
+    would contain; :meth:`preview` builds one of them on demand.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.order, self.offsets, group_to_full_po = partition_groups(df)
+        self.validation = Validation.of_frame(df, order=self.order)
+
+        boxes = box_numbers(df.iloc[:, 0], list(self.offsets.values()), self.order)
+        box_counts, qty_totals = group_workloads(df, self.order, self.offsets, boxes)
+
+        self._groups = {}
+        records = []
+        for g, n_boxes, qty in zip(self.offsets, box_counts.tolist(), qty_totals.tolist()):
+            start, stop = self.offsets[g]
+            po = process_po_number(group_to_full_po[g])
+            self._groups.setdefault(po, g)
+            row = summary_row(po, None, po[:31], stop - start, self.validation.has_missing_po(g),
+                              self.validation.dim_flags[start:stop].any())
+            records.append(dict(row, Boxes=int(n_boxes), Quantity=int(qty)))
+        self.table = pd.DataFrame(records, columns=SUMMARY_COLUMNS + ["Boxes", "Quantity"])
+        self.table = self.table.sort_values("PO Number", kind="stable", ignore_index=True)
+        self.table = self.table[INDEX_COLUMNS]
+
+    @classmethod
+    def read(cls, source):
+        return cls(read_manifest(source))
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def pos(self):
+        return self.table["PO Number"].tolist()
+
+    def preview(self, po):
+        """The sheet rows, pivot and dimensions of one PO, as on its PO sheet."""
+        g = self._groups[po]
+        start, stop = self.offsets[g]
+        group_df = self.df.take(self.order[start:stop])
+
+        pivot = None
+        pivots = UpcBoxPivots.of_frame(group_df, {g: (0, len(group_df))})
+        if pivots is not None:
+            pivot = pivot_frame(pivots.for_group(g))
+
+        sheet = number_boxes(group_df)
+        missing_letters = self.validation.missing_letters.get(g, [])
+        flags = np.zeros(sheet.shape, dtype=bool)
+        flags[:, [c + 1 for c in dimension_columns(self.df.shape[1])]] = \
+            self.validation.dim_flags[start:stop][sheet.index.to_numpy()]
+        if missing_letters:
+            flags[:, 3] = True
+
+        rows = pd.DataFrame(text_matrix(sheet, blank_strings=("nan",)), columns=sheet.columns)
+        line = self.table[self.table["PO Number"] == po].iloc[0]
+        return GroupPreview(po, po[:31], rows, flags, pivot, box_dimensions(sheet),
+                            int(line["Boxes"]), int(line["Quantity"]), missing_letters)
@@ -0,0 +1,165 @@
+"""Manifest readers for .xlsx, .csv and .parquet input.
+
+Every reader returns the manifest with all cells as text (missing cells as
+NaN), matching ``pd.read_excel(..., dtype=str)``, so carton numbers and
+UPCs keep their leading zeros whatever the input format. A file the
+backend cannot parse raises :class:`ManifestError` with a readable message.
+"""
+import os
+import zipfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+XLSX = "xlsx"
+CSV = "csv"
+PARQUET = "parquet"
+
+# Extensions accepted by the upload widget.
+SUPPORTED_TYPES = [XLSX, CSV, PARQUET]
+
+_NAMES = {XLSX: "an Excel workbook", CSV: "a CSV file", PARQUET: "a Parquet file"}
+
+_MAGIC = [
+    (b"PK\x03\x04", XLSX),
+    (b"PAR1", PARQUET),
+]
+
+
+class ManifestError(ValueError):
+    """Raised when an uploaded manifest cannot be processed."""
+
+
+def _backend_errors():
+    # What the parsers raise for a damaged or mislabelled file. pandas'
+    # ParserError and EmptyDataError, UnicodeDecodeError and pyarrow's
+    # ArrowInvalid are all ValueErrors.
+    errors = [ValueError, zipfile.BadZipFile]
+    try:
+        from python_calamine import CalamineError
+        errors.append(CalamineError)
+    except ImportError:
+        pass
+    try:
+        from openpyxl.utils.exceptions import InvalidFileException
+        errors.append(InvalidFileException)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+@contextmanager
+def _parsing(fmt):
+    """Turn a parser failure into a :class:`ManifestError` naming the format."""
+    try:
+        yield
+    except ManifestError:
+        raise
+    except UnicodeDecodeError:
+        raise ManifestError(
+            f"Could not read the file as {_NAMES[fmt]}: it is not UTF-8 text. "
+            "Please save it as UTF-8 CSV or as .xlsx."
+        ) from None
+    except _backend_errors() as exc:
+        reason = " ".join(str(exc).split()).rstrip(".") or type(exc).__name__
+        raise ManifestError(
+            f"Could not read the file as {_NAMES[fmt]}: {reason}. Please check your file."
+        ) from exc
+
+
+def _peek(source, n):
+    if hasattr(source, "read"):
+        pos = source.tell()
+        head = source.read(n)
+        source.seek(pos)
+        return head
+    with open(source, "rb") as fh:
+        return fh.read(n)
+
+
+def detect_format(source):
+    """Detect the input format from its leading bytes, falling back to the name."""
+    head = _peek(source, 4)
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    name = getattr(source, "name", source)
+    ext = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if ext in SUPPORTED_TYPES:
+        return ext
+    return CSV
+
+
+def xlsx_engine():
+    """``calamine`` when python-calamine is installed and pandas supports it.
+
+    Otherwise ``openpyxl``, which pandas already opens in read-only
+    (streaming) mode.
+    """
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return "openpyxl"
+    major, minor = (int(p) for p in pd.__version__.split(".")[:2])
+    return "calamine" if (major, minor) >= (2, 2) else "openpyxl"
+
+
+def _cell_text(value):
+    # Excel readers render whole-number floats without the trailing ".0".
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _as_text(df):
+    for name in df.columns:
+        col = df[name]
+        if not (pd.api.types.is_string_dtype(col) or pd.api.types.is_object_dtype(col)):
+            df[name] = col.map(_cell_text, na_action="ignore").astype(object)
+    return df
+
+
+def _parquet_columns(source):
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return [n for n in schema.names if not n.startswith("__index_level_")]
+
+
+def read_header(source):
+    """Column names of a manifest without reading its rows.
+
+    Raises :class:`ManifestError` if the file cannot be parsed.
+    """
+    fmt = detect_format(source)
+    with _parsing(fmt):
+        if fmt == PARQUET:
+            return _parquet_columns(source)
+        if fmt == CSV:
+            header = pd.read_csv(source, nrows=0)
+        else:
+            header = pd.read_excel(source, nrows=0, engine=xlsx_engine())
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return list(header.columns)
+
+
+def read_table(source, usecols=None):
+    """Read a manifest as text.
+
+    ``usecols`` is an optional list of column positions; only those columns
+    are parsed. Raises :class:`ManifestError` if the file cannot be parsed.
+    """
+    fmt = detect_format(source)
+    with _parsing(fmt):
+        if fmt == PARQUET:
+            columns = None
+            if usecols is not None:
+                names = _parquet_columns(source)
+                columns = [names[i] for i in usecols if i < len(names)]
+            return _as_text(pd.read_parquet(source, columns=columns))
+        if fmt == CSV:
+            return pd.read_csv(source, dtype=str, usecols=usecols)
+        return pd.read_excel(source, dtype=str, usecols=usecols, engine=xlsx_engine())
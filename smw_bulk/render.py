@@ -0,0 +1,82 @@
+"""Render :mod:`smw_bulk.layout` plans into an xlsxwriter workbook."""
+import xlsxwriter
+
+from .cells import text_matrix
+from .layout import Block, style_properties
+
+# Rows of a Block converted to text at a time.
+BLOCK_CHUNK_ROWS = 10000
+
+
+class FormatRegistry:
+    """Creates each named style once and shares Formats between identical styles."""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._by_name = {}
+        self._by_properties = {}
+
+    def __getitem__(self, name):
+        fmt = self._by_name.get(name)
+        if fmt is None:
+            props = style_properties(name)
+            key = tuple(sorted(props.items()))
+            fmt = self._by_properties.get(key)
+            if fmt is None:
+                fmt = self._by_properties[key] = self.workbook.add_format(props)
+            self._by_name[name] = fmt
+        return fmt
+
+    def __len__(self):
+        return len(self._by_properties)
+
+
+class WorkbookRenderer:
+    """Writes sheet plans to ``output`` in the order they are reserved or rendered.
+
+    With ``constant_memory`` xlsxwriter streams each sheet to a temporary
+    file row by row; plans are always rendered top to bottom, so both modes
+    produce the same cells.
+    """
+
+    def __init__(self, output, constant_memory=False):
+        options = {"constant_memory": True} if constant_memory else {}
+        self.workbook = xlsxwriter.Workbook(output, options)
+        self.formats = FormatRegistry(self.workbook)
+        self._reserved = {}
+
+    def reserve(self, name):
+        """Add an empty sheet now so it keeps its tab position; render it later."""
+        self._reserved[name] = self.workbook.add_worksheet(name)
+
+    def render(self, plan):
+        ws = self._reserved.pop(plan.name, None)
+        if ws is None:
+            ws = self.workbook.add_worksheet(plan.name)
+        formats = self.formats
+
+        if plan.tab_color:
+            ws.set_tab_color(plan.tab_color)
+        for first_col, last_col, width in plan.columns:
+            ws.set_column(first_col, last_col, width)
+
+        for item in plan.ordered_items():
+            fmt = formats[item.style]
+            if isinstance(item, Block):
+                frame = item.frame
+                for start in range(0, len(frame), BLOCK_CHUNK_ROWS):
+                    rows = text_matrix(frame.iloc[start:start + BLOCK_CHUNK_ROWS], item.blank_strings)
+                    for offset, values in enumerate(rows):
+                        ws.write_row(item.row + start + offset, item.col, values, fmt)
+            elif item.formula:
+                ws.write_formula(item.row, item.col, item.values[0], fmt)
+            else:
+                ws.write_row(item.row, item.col, item.values, fmt)
+
+        for first_row, first_col, last_row, last_col, options in plan.conditional_formats:
+            options = dict(options, format=formats[options["format"]])
+            ws.conditional_format(first_row, first_col, last_row, last_col, options)
+        return ws
+
+    def close(self):
+        self.workbook.close()
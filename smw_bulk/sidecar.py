@@ -0,0 +1,115 @@
+"""Columnar export of a run's results next to the workbook.
+
+Downstream jobs that need the box numbering, pivots or dimensions should
+not have to parse the styled workbook. A :class:`Sidecar` passed to
+:func:`~smw_bulk.engine.process_manifest` is handed the arrays the engine
+has already computed (row order, Box#, the UPC x Box# sums, the summary
+rows) and turns them into four long tables, all keyed by ``Sheet``:
+
+* ``box_lines``: every manifest row in PO sheet order with its Box# and
+  its row on Original Data;
+* ``pivots``: one row per non-empty UPC x Box# cell;
+* ``dimensions``: one row per box with its weight and size;
+* ``po_summary``: the PO Summary rows.
+
+Tables are written as Parquet, or as uncompressed Arrow IPC files that can
+be memory-mapped (``pyarrow.ipc.open_file(pyarrow.memory_map(path))``).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .engine import DIMENSION_HEADERS, SUMMARY_COLUMNS
+from .validation import DIMENSION_COLUMNS, PO_COLUMN
+
+BOX_LINES = "box_lines"
+PIVOTS = "pivots"
+DIMENSIONS = "dimensions"
+PO_SUMMARY = "po_summary"
+
+PARQUET = "parquet"
+ARROW = "arrow"
+FORMATS = [PARQUET, ARROW]
+
+# Data rows of Original Data start on spreadsheet row 2.
+FIRST_ROW = 2
+
+
+def _write_table(frame, path, fmt):
+    if fmt == PARQUET:
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_feather(path, compression="uncompressed")
+
+
+class Sidecar:
+    """The columnar tables of one run, filled in by the engine.
+
+    ``tables`` maps table names to frames; a table is missing when the
+    manifest lacks its columns (no UPC/quantity or no dimension columns).
+    """
+
+    def __init__(self):
+        self.tables = {}
+
+    def add_groups(self, df, order, offsets, boxes, pivots, sheets):
+        """Box lines, dimensions and pivots from the engine's grouping.
+
+        ``order``, ``offsets`` and ``boxes`` are as in
+        :func:`~smw_bulk.engine.iter_sheet_plans`, ``pivots`` is its
+        :class:`~smw_bulk.pivot.UpcBoxPivots` (or None) and ``sheets``
+        maps each group to its sheet name, in sheet order.
+        """
+        rank = {g: i for i, g in enumerate(sheets)}
+        names = list(sheets.values())
+        ranges = list(offsets.values())
+        end = ranges[-1][1] if ranges else 0
+        rows = order[:end]
+        sheet_codes = np.repeat(np.array([rank[g] for g in offsets], dtype=np.int64),
+                                [stop - start for start, stop in ranges])
+
+        # As on the PO sheets: by sheet, then Box#, then PO.
+        po_codes, _ = pd.factorize(df.iloc[:, PO_COLUMN].take(rows), sort=True)
+        po_codes[po_codes < 0] = po_codes.max() + 1 if len(po_codes) else 0
+        line_order = np.lexsort((po_codes, boxes[:end], sheet_codes))
+        positions = rows[line_order]
+
+        lines = df.take(positions).reset_index(drop=True)
+        lines.insert(0, "Sheet", pd.Categorical.from_codes(sheet_codes[line_order], names))
+        lines.insert(1, "Box#", boxes[:end][line_order])
+        lines.insert(2, "Source Row", positions + FIRST_ROW)
+        self.tables[BOX_LINES] = lines
+
+        if df.shape[1] > DIMENSION_COLUMNS[-1]:
+            first = ~lines.duplicated(["Sheet", "Box#"]).to_numpy()
+            dims = lines.loc[first, ["Sheet", "Box#"] + [df.columns[c] for c in DIMENSION_COLUMNS]]
+            dims.columns = ["Sheet"] + DIMENSION_HEADERS
+            self.tables[DIMENSIONS] = dims.reset_index(drop=True)
+
+        if pivots is not None:
+            table = pivots.table
+            codes = table["group"].map(rank).to_numpy(dtype=np.int64)
+            by_sheet = np.argsort(codes, kind="stable")
+            self.tables[PIVOTS] = pd.DataFrame({
+                "Sheet": pd.Categorical.from_codes(codes[by_sheet], names),
+                "UPC": table["upc"].array.take(by_sheet),
+                "Box#": table["box"].to_numpy()[by_sheet],
+                "Qty": table["qty"].to_numpy()[by_sheet],
+            })
+
+    def add_summary(self, rows):
+        """The PO Summary, one :func:`~smw_bulk.engine.summary_row` per PO sheet."""
+        self.tables[PO_SUMMARY] = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    def write(self, directory, fmt=PARQUET):
+        """Write every table as ``<directory>/<name>.<fmt>``; returns the paths."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown sidecar format {fmt!r}; expected one of {FORMATS}.")
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, frame in self.tables.items():
+            path = os.path.join(directory, f"{name}.{fmt}")
+            _write_table(frame, path, fmt)
+            paths.append(path)
+        return paths
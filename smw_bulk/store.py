@@ -0,0 +1,210 @@
+"""On-disk store of planned PO sheets for incremental reprocessing.
+
+Revisions of a manifest usually change only a few POs. Each PO sheet plan
+is saved under a hash of its ``group_15`` partition (the rows, the header
+and the sheet's name and assignee), so a later upload replans only the
+groups whose hash is new. Team assignments are saved too, so unchanged POs
+keep their person, and with it their tab colour and PO Summary row.
+
+Entries are pickles, so a store must only be readable and writable by the
+user running the tool: :class:`GroupStore` refuses a directory owned by
+someone else or writable by others. Entries not used for ``max_age``
+seconds, or beyond ``max_bytes`` in total, are removed by
+:meth:`GroupStore.prune`, which the engine runs after every build.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Bump when the layout of a PO sheet plan changes to invalidate old entries.
+STORE_VERSION = 1
+
+# Entries (and assignments) unused for this long are pruned.
+DEFAULT_MAX_AGE = 90 * 24 * 3600
+
+# Total size of the saved PO sheets; the least recently used go first.
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+_ASSIGNMENTS = "assignments.json"
+_GROUPS = "groups"
+_LOCK = ".lock"
+
+
+def row_hashes(df):
+    """One 64-bit hash per row of ``df``, computed in a single pass."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def group_key(hashes, columns, sheet_name, person, color=None):
+    """Store key of one group from its rows' :func:`row_hashes`."""
+    h = hashlib.sha256(f"v{STORE_VERSION}".encode("utf-8"))
+    for part in (list(map(str, columns)), sheet_name, person, color):
+        h.update(b"\0")
+        h.update(repr(part).encode("utf-8"))
+    h.update(b"\0")
+    h.update(np.ascontiguousarray(hashes).tobytes())
+    return h.hexdigest()
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def check_private(path):
+    """Raise PermissionError unless ``path`` is owned by this user and not writable by others."""
+    if not hasattr(os, "getuid"):  # Windows: no POSIX owner or mode bits
+        return
+    st = os.stat(path)
+    if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(
+            f"Refusing to use store {path!r}: it must be owned by the current user "
+            "and not writable by group or others."
+        )
+
+
+class GroupStore:
+    """Planned PO sheets and team assignments kept under ``root``.
+
+    ``root`` is created private to this user, and an existing one must be
+    owned by this user and not writable by others (see :func:`check_private`).
+    Entries are written atomically and assignments are updated under a lock,
+    so several threads or processes may share a store; a damaged or
+    unreadable entry is treated as missing.
+    """
+
+    def __init__(self, root, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        check_private(root)
+        os.makedirs(os.path.join(root, _GROUPS), mode=0o700, exist_ok=True)
+
+    def __getstate__(self):
+        # Sent to process-pool workers; each process gets its own thread lock
+        # and relies on the file lock to coordinate with the others.
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.root, _GROUPS, key[:2], key + ".pkl")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """The saved ``(plan, excel_row)`` for ``key``, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                result = pickle.load(fh)
+            os.utime(path)  # mark as recently used for prune()
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return result
+
+    def put(self, key, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        _write_atomic(path, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @contextmanager
+    def _locked(self):
+        # Threads of this process, then other processes sharing the directory.
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, _LOCK), "a") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load_assignments(self):
+        # PO -> {"person", "seen"}
+        try:
+            with open(os.path.join(self.root, _ASSIGNMENTS), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def assignments(self):
+        """Saved ``PO -> person`` map."""
+        return {po: entry["person"] for po, entry in self._load_assignments().items()}
+
+    def save_assignments(self, po_to_person):
+        """Record the person of each PO, dropping POs not seen for ``max_age``."""
+        now = time.time()
+        with self._locked():
+            saved = self._load_assignments()
+            saved.update({po: {"person": person, "seen": now}
+                          for po, person in po_to_person.items()})
+            saved = {po: entry for po, entry in saved.items()
+                     if now - entry["seen"] <= self.max_age}
+            data = json.dumps(saved, indent=1, sort_keys=True).encode("utf-8")
+            _write_atomic(os.path.join(self.root, _ASSIGNMENTS), data)
+
+    def prune(self):
+        """Remove PO sheets unused for ``max_age``, then the least recently used
+        until at most ``max_bytes`` remain. Returns the number removed."""
+        entries = []
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, _GROUPS)):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(reverse=True)
+
+        now = time.time()
+        total = removed = 0
+        for mtime, size, path in entries:
+            total += size
+            if now - mtime > self.max_age or total > self.max_bytes:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def clear(self):
+        with self._locked():
+            shutil.rmtree(os.path.join(self.root, _GROUPS), ignore_errors=True)
+            os.makedirs(os.path.join(self.root, _GROUPS), mode=0o700, exist_ok=True)
+            try:
+                os.remove(os.path.join(self.root, _ASSIGNMENTS))
+            except OSError:
+                pass
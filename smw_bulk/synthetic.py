@@ -0,0 +1,137 @@
+"""Synthetic bulk manifests shaped like the vendor files, for benchmarks.
+
+``python -m smw_bulk.synthetic out.xlsx --rows 50000 --pos 1000`` writes one;
+see :func:`synthetic_manifest` for the controls.
+"""
+import argparse
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "Carton No", "SKU", "PO Number", "UPC", "Description", "Qty", "Color", "Size",
+    "Style", "Ship To", "Pkg Wt (Lbs)", "Pkg Length (in)", "Pkg Width (in)",
+    "Pkg Height (in)", "Notes",
+]
+
+_COLORS = ["Black", "White", "Red", "Navy", "Grey", "Green"]
+_SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+_CITIES = ["Dallas", "Chicago", "Reno", "Columbus", "Atlanta"]
+
+
+def _shipment_letters(rng, pos, letters, gap_rate):
+    """Letters per PO: ``A`` onwards, with one letter skipped at ``gap_rate``."""
+    out = []
+    for _ in range(pos):
+        if letters >= 2 and rng.random() < gap_rate:
+            # Skip one letter after A, e.g. A, B, D.
+            skip = int(rng.integers(1, letters))
+            out.append([c for i, c in enumerate(string.ascii_uppercase[:letters + 1]) if i != skip])
+        else:
+            out.append(list(string.ascii_uppercase[:letters]))
+    return out
+
+
+def synthetic_manifest(rows=1000, pos=50, letters=3, letter_gap_rate=0.1, boxes_per_po=20,
+                       upcs=200, bad_dimension_rate=0.05, seed=0):
+    """A manifest frame of text cells, as :func:`~smw_bulk.engine.read_manifest` returns.
+
+    ``letters`` shipment letters per PO (0 for unlettered POs), of which
+    ``letter_gap_rate`` of POs skip one; ``boxes_per_po`` distinct cartons
+    per PO; ``upcs`` distinct UPCs overall; ``bad_dimension_rate`` of the
+    dimension cells are blank or zero.
+    """
+    rng = np.random.default_rng(seed)
+
+    po_index = rng.integers(0, pos, rows)
+    po_base = np.array([f"PO{1000000000000 + i * 7919:013d}" for i in range(pos)], dtype=object)
+    po_numbers = po_base[po_index]
+    if letters:
+        po_letters = _shipment_letters(rng, pos, letters, letter_gap_rate)
+        choice = (rng.random(rows) * np.array([len(po_letters[i]) for i in po_index])).astype(int)
+        po_numbers = po_numbers + np.array(
+            [po_letters[p][c] for p, c in zip(po_index.tolist(), choice.tolist())], dtype=object)
+
+    # Cartons belong to one PO; dimensions belong to one carton.
+    carton_index = po_index * boxes_per_po + rng.integers(0, boxes_per_po, rows)
+    n_cartons = pos * boxes_per_po
+    cartons = np.char.add("00", np.char.zfill((carton_index + 10 ** 7).astype(str), 10))
+    carton_dims = np.column_stack([
+        rng.integers(5, 60, n_cartons),
+        rng.integers(10, 30, n_cartons),
+        rng.integers(8, 24, n_cartons),
+        rng.integers(4, 20, n_cartons),
+    ]).astype(str).astype(object)
+    dims = carton_dims[carton_index]
+    bad = rng.random(dims.shape) < bad_dimension_rate
+    dims[bad] = np.where(rng.random(int(bad.sum())) < 0.5, None, "0")
+
+    upc_index = rng.integers(0, upcs, rows)
+    upc_codes = np.char.zfill((upc_index + 10 ** 10).astype(str), 12)
+
+    frame = pd.DataFrame({
+        "Carton No": cartons.astype(object),
+        "SKU": np.char.add("SKU-", upc_index.astype(str)).astype(object),
+        "PO Number": po_numbers,
+        "UPC": upc_codes.astype(object),
+        "Description": np.char.add("Item ", upc_index.astype(str)).astype(object),
+        "Qty": rng.integers(1, 25, rows).astype(str).astype(object),
+        "Color": np.array(_COLORS, dtype=object)[upc_index % len(_COLORS)],
+        "Size": np.array(_SIZES, dtype=object)[upc_index % len(_SIZES)],
+        "Style": np.char.add("ST", (upc_index // 6).astype(str)).astype(object),
+        "Ship To": np.array(_CITIES, dtype=object)[po_index % len(_CITIES)],
+        "Pkg Wt (Lbs)": dims[:, 0],
+        "Pkg Length (in)": dims[:, 1],
+        "Pkg Width (in)": dims[:, 2],
+        "Pkg Height (in)": dims[:, 3],
+        "Notes": np.full(rows, None, dtype=object),
+    }, columns=COLUMNS)
+    return frame
+
+
+def write_manifest(frame, path):
+    """Write ``frame`` as .xlsx, .csv or .parquet, chosen by the extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        frame.to_csv(path, index=False)
+    elif ext == ".parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_excel(path, index=False, engine="xlsxwriter")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="smw_bulk.synthetic",
+        description="Write a synthetic bulk manifest for benchmarking.",
+    )
+    parser.add_argument("output", help="manifest path (.xlsx, .csv or .parquet)")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--pos", type=int, default=50)
+    parser.add_argument("--letters", type=int, default=3, help="shipment letters per PO")
+    parser.add_argument("--letter-gap-rate", type=float, default=0.1,
+                        help="share of POs that skip a shipment letter")
+    parser.add_argument("--boxes-per-po", type=int, default=20)
+    parser.add_argument("--upcs", type=int, default=200, help="distinct UPCs")
+    parser.add_argument("--bad-dimension-rate", type=float, default=0.05,
+                        help="share of dimension cells left blank or zero")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    frame = synthetic_manifest(
+        rows=args.rows, pos=args.pos, letters=args.letters,
+        letter_gap_rate=args.letter_gap_rate, boxes_per_po=args.boxes_per_po,
+        upcs=args.upcs, bad_dimension_rate=args.bad_dimension_rate, seed=args.seed,
+    )
+    print(write_manifest(frame, args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
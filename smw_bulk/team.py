@@ -0,0 +1,164 @@
+"""Team roster and PO assignment.
+
+Two strategies are available:
+
+* ``blocks`` (the default): the sorted PO list is cut into contiguous,
+  evenly sized blocks, one per person;
+* ``balanced``: POs are handed out largest first to whoever has the least
+  work relative to their capacity (a heap-based greedy scheduler), where a
+  PO's work is a weighted sum of a fixed cost, its boxes and its quantity.
+
+A :class:`Roster` holds the members, their colours and capacities, the
+workload weights and the strategy, and can be loaded from a JSON file.
+"""
+import heapq
+import json
+
+from .layout import TEAM_COLORS
+
+TEAM_MEMBERS = ["Paulo", "JB", "Stephanie", "Sunshine", "Orville"]
+
+BLOCKS = "blocks"
+BALANCED = "balanced"
+STRATEGIES = [BLOCKS, BALANCED]
+
+# Workload of a PO: po + boxes * number of boxes + qty * total quantity.
+DEFAULT_WEIGHTS = {"po": 1.0, "boxes": 1.0, "qty": 0.1}
+
+
+def assign_team(unique_pos, team_members=TEAM_MEMBERS):
+    """Split the sorted PO list into contiguous, evenly sized blocks per person."""
+    total_pos = len(unique_pos)
+
+    base = total_pos // len(team_members)
+    remainder = total_pos % len(team_members)
+
+    assignments = []
+    for i, t in enumerate(team_members):
+        n = base + (1 if i < remainder else 0)
+        assignments.extend([t] * n)
+
+    return assignments[:total_pos]
+
+
+def assign_team_stable(unique_pos, previous, team_members=TEAM_MEMBERS):
+    """Assign POs keeping the person each had in ``previous`` (a PO -> person map).
+
+    New POs go one at a time to whoever has the fewest. With no known POs
+    this is the same as :func:`assign_team`.
+    """
+    counts = {t: 0 for t in team_members}
+    for po in unique_pos:
+        if previous.get(po) in counts:
+            counts[previous[po]] += 1
+    if not any(counts.values()):
+        return assign_team(unique_pos, team_members)
+
+    assignments = []
+    for po in unique_pos:
+        person = previous.get(po)
+        if person not in counts:
+            person = min(team_members, key=counts.__getitem__)
+            counts[person] += 1
+        assignments.append(person)
+    return assignments
+
+
+def assign_balanced(unique_pos, workloads, team_members=TEAM_MEMBERS, capacity=None,
+                    previous=None):
+    """Assign POs so everyone's workload, relative to their capacity, is even.
+
+    ``workloads`` maps each PO to its work; ``capacity`` optionally maps a
+    person to a relative share (default 1). POs in ``previous`` keep their
+    person and count towards that person's load. The rest are placed
+    largest first on whoever has the lowest load (longest-processing-time
+    greedy), in O(n log n + n log m).
+    """
+    capacity = capacity or {}
+    previous = previous or {}
+    load = {t: 0.0 for t in team_members}
+    assigned = {}
+    for po in unique_pos:
+        person = previous.get(po)
+        if person in load:
+            assigned[po] = person
+            load[person] += workloads.get(po, 0.0)
+
+    heap = [(load[t] / capacity.get(t, 1.0), i, t) for i, t in enumerate(team_members)]
+    heapq.heapify(heap)
+    pending = sorted((po for po in unique_pos if po not in assigned),
+                     key=lambda po: (-workloads.get(po, 0.0), po))
+    for po in pending:
+        _, i, person = heapq.heappop(heap)
+        assigned[po] = person
+        load[person] += workloads.get(po, 0.0)
+        heapq.heappush(heap, (load[person] / capacity.get(person, 1.0), i, person))
+    return [assigned[po] for po in unique_pos]
+
+
+class Roster:
+    """Who POs are assigned to, how, and in which colours.
+
+    ``members`` is the roster in order. ``colors`` maps members to their tab
+    and PO Summary colour, on top of ``TEAM_COLORS``; members with neither
+    get plain cells. ``capacity`` maps members to a relative share of the
+    work for the ``balanced`` strategy and ``weights`` are the workload
+    weights (see ``DEFAULT_WEIGHTS``).
+    """
+
+    def __init__(self, members=None, colors=None, capacity=None, weights=None, strategy=BLOCKS):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy {strategy!r}; expected one of {STRATEGIES}.")
+        self.members = list(members or TEAM_MEMBERS)
+        if not self.members:
+            raise ValueError("The team roster is empty.")
+        self.colors = dict(TEAM_COLORS, **(colors or {}))
+        self.capacity = dict(capacity or {})
+        for member, share in self.capacity.items():
+            if not share > 0:
+                raise ValueError(f"Capacity of {member!r} must be a positive number, got {share!r}.")
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.strategy = strategy
+
+    @classmethod
+    def from_dict(cls, config, strategy=None):
+        """Build a roster from ``{"members": [{"name", "color", "capacity"}...],
+        "weights": {...}, "strategy": ...}``; every key is optional."""
+        members = config.get("members")
+        colors = capacity = None
+        if members is not None:
+            members = [m if isinstance(m, dict) else {"name": m} for m in members]
+            colors = {m["name"]: m["color"] for m in members if m.get("color")}
+            try:
+                capacity = {m["name"]: float(m["capacity"]) for m in members if "capacity" in m}
+            except (TypeError, ValueError):
+                raise ValueError("Roster capacities must be positive numbers.") from None
+            members = [m["name"] for m in members]
+        return cls(members, colors, capacity, config.get("weights"),
+                   strategy or config.get("strategy", BLOCKS))
+
+    @classmethod
+    def load(cls, path, strategy=None):
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh), strategy)
+
+    @property
+    def balanced(self):
+        return self.strategy == BALANCED
+
+    def workload(self, boxes, qty):
+        w = self.weights
+        return w["po"] + w["boxes"] * boxes + w["qty"] * qty
+
+    def assign(self, unique_pos, workloads=None, previous=None):
+        """Person for each PO of the sorted ``unique_pos``.
+
+        ``workloads`` (PO -> work) is needed by the ``balanced`` strategy;
+        POs in ``previous`` keep their person if they are still on the roster.
+        """
+        if self.balanced:
+            return assign_balanced(unique_pos, workloads or {}, self.members,
+                                   self.capacity, previous)
+        if previous is not None:
+            return assign_team_stable(unique_pos, previous, self.members)
+        return assign_team(unique_pos, self.members)
@@ -0,0 +1,145 @@
+"""Vectorised manifest checks shared by the PO sheets and the pre-flight report.
+
+Two checks are run over the whole manifest at once:
+
+* blank or zero package dimensions (manifest columns K-N, which become
+  L-O on the PO sheets once Box# is inserted);
+* missing shipment letters: a PO whose lettered shipments start at ``A``
+  but skip a letter (e.g. A, B, D).
+
+Rows with a blank PO (column C empty or only spaces) belong to no group:
+they stay on Original Data, appear on no PO sheet, and are listed as
+``rows_without_po`` in the report.
+"""
+import numpy as np
+import pandas as pd
+
+PO_COLUMN = 2
+DIMENSION_COLUMNS = [10, 11, 12, 13]
+
+
+def blank_po(po):
+    """Bool array: True for rows whose PO is missing or only whitespace."""
+    return (po.isna() | po.astype(str).str.strip().eq("")).to_numpy(dtype=bool)
+
+
+def group_keys(po, width=15):
+    """The ``group_15`` key of every row: the first 15 characters of the PO.
+
+    Rows with a :func:`blank_po` get NaN, whatever the pandas version.
+    """
+    return po.astype(str).str[:width].mask(blank_po(po))
+
+
+def dimension_columns(n_columns):
+    return [c for c in DIMENSION_COLUMNS if c < n_columns]
+
+
+def dimension_flags(dims):
+    """``(rows, cols)`` bool array: True where a dimension is blank or zero."""
+    flags = np.zeros(dims.shape, dtype=bool)
+    for i in range(dims.shape[1]):
+        col = dims.iloc[:, i]
+        text = col.astype(str).str.strip()
+        flags[:, i] = (col.isna() | text.eq("") | text.eq("0")).to_numpy(dtype=bool)
+    return flags
+
+
+def missing_po_letters(po, groups):
+    """Map each group with a gap in its shipment letters to the missing letters.
+
+    Only groups whose letters start at ``A`` are checked, as before.
+    """
+    last = po.astype(str).str[-1]
+    lettered = last.str.isalpha().fillna(False).to_numpy(dtype=bool) & ~blank_po(po)
+    letters = pd.DataFrame({
+        "group": np.asarray(groups)[lettered],
+        "letter": last[lettered].str.upper().to_numpy(),
+    }).drop_duplicates().sort_values(["group", "letter"])
+    if letters.empty:
+        return {}
+
+    codes = letters["letter"].map({c: ord(c[0]) for c in letters["letter"].unique()})
+    same_group = letters["group"].eq(letters["group"].shift())
+    gap = (codes.diff() > 1) & same_group
+    starts_at_a = letters.groupby("group")["letter"].transform("first").eq("A")
+    flagged = letters.loc[(gap & starts_at_a).to_numpy(), "group"].unique()
+
+    missing = {}
+    for g, group_letters in letters[letters["group"].isin(flagged)].groupby("group")["letter"]:
+        present = {ord(c[0]) for c in group_letters}
+        missing[g] = [chr(c) for c in range(min(present), max(present)) if c not in present]
+    return missing
+
+
+class Validation:
+    """Flags for a whole manifest, computed once.
+
+    ``dim_flags`` is aligned with the rows of the frame it was computed from,
+    in the ``order`` given if any;
+    ``missing_letters`` maps group keys to the letters they are missing.
+    """
+
+    def __init__(self, dim_flags, missing_letters):
+        self.dim_flags = dim_flags
+        self.missing_letters = missing_letters
+
+    @classmethod
+    def of_frame(cls, df, groups=None, order=None):
+        """Flags of ``df``; with ``order``, ``dim_flags`` follow those row positions."""
+        po = df.iloc[:, PO_COLUMN]
+        if groups is None:
+            groups = group_keys(po)
+        dims = df.iloc[:, dimension_columns(df.shape[1])]
+        dim_flags = dimension_flags(dims)
+        if order is not None:
+            dim_flags = dim_flags[order]
+        return cls(dim_flags, missing_po_letters(po, groups))
+
+    def has_missing_po(self, group):
+        return group in self.missing_letters
+
+
+def validation_report(po, dims, po_names=None, first_row=2):
+    """Machine-readable report of every check, without building a workbook.
+
+    ``po`` and ``dims`` are the PO column and the dimension columns of the
+    manifest in input order; cell rows are reported as spreadsheet rows
+    starting at ``first_row``. ``po_names`` optionally maps group keys to
+    the PO sheet names.
+    """
+    groups = group_keys(po)
+    no_po = np.flatnonzero(groups.isna().to_numpy())
+    flags = dimension_flags(dims)
+    missing = missing_po_letters(po, groups)
+    group_array = groups.to_numpy()
+
+    counts = pd.Series(flags.sum(axis=1), index=groups.index).groupby(group_array).agg(["size", "sum"])
+
+    bad_rows, bad_cols = np.nonzero(flags)
+    cells_by_group = {}
+    for r, c in zip(bad_rows.tolist(), bad_cols.tolist()):
+        cells_by_group.setdefault(group_array[r], []).append(
+            {"row": r + first_row, "column": str(dims.columns[c])}
+        )
+
+    report_groups = []
+    for g, (rows, blank) in counts.iterrows():
+        report_groups.append({
+            "group": g,
+            "po": po_names.get(g, g) if po_names else g,
+            "rows": int(rows),
+            "blank_or_zero_dimensions": int(blank),
+            "dimension_cells": cells_by_group.get(g, []),
+            "missing_po_letters": missing.get(g, []),
+        })
+
+    return {
+        "ok": not bad_rows.size and not missing and not no_po.size,
+        "rows": int(len(po)),
+        "rows_without_po": (no_po + first_row).tolist(),
+        "groups": len(report_groups),
+        "blank_or_zero_dimensions": int(bad_rows.size),
+        "pos_with_missing_letters": len(missing),
+        "details": report_groups,
+    }
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from smw_bulk import batch
+from smw_bulk.batch import BatchStopped, process_batch
+
+
+class Cancelled(Exception):
+    pass
+
+
+def test_stopping_a_batch_stops_running_files(monkeypatch):
+    stopped = []
+    running = threading.Event()
+
+    def endless(source, summary, on_progress, **options):
+        running.set()
+        try:
+            while True:
+                on_progress(0, 1)
+                time.sleep(0.01)
+        except BatchStopped as exc:
+            stopped.append(exc.args[0])
+            raise
+
+    def report(name, error, done, total):
+        if running.is_set():
+            raise Cancelled()
+
+    monkeypatch.setattr(batch, "process_manifest", endless)
+    files = [("a.xlsx", b""), ("b.xlsx", b""), ("c.xlsx", b"")]
+    with pytest.raises(Cancelled):
+        process_batch(files, workers=2, on_progress=report)
+    assert sorted(stopped) == ["a.xlsx", "b.xlsx"]
+
+
+def test_progress_reports_each_file(monkeypatch):
+    def fake(source, summary, on_progress, **options):
+        if source.getvalue() == b"bad":
+            raise ValueError("bad file")
+        return b"workbook"
+
+    calls = []
+    monkeypatch.setattr(batch, "process_manifest", fake)
+    result = process_batch([("a.xlsx", b"ok"), ("b.xlsx", b"bad")],
+                           on_progress=lambda *args: calls.append(args))
+    finished = sorted(call for call in calls if call[0] is not None)
+    assert finished[0][:2] == ("a.xlsx", None)
+    assert finished[1][:2] == ("b.xlsx", "bad file")
+    assert result.files == ["a.xlsx"]
+    assert result.errors == {"b.xlsx": "bad file"}
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from smw_bulk.cache import ResultCache, content_key
+
+
+def test_content_key_depends_on_data_and_options():
+    assert content_key(b"abc") == content_key(b"abc")
+    assert content_key(b"abc") != content_key(b"abd")
+    assert content_key(b"abc", True) != content_key(b"abc", False)
+
+
+def test_entry_limit_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"  # "b" is now the oldest
+    cache.put("c", b"3")
+    assert "b" not in cache
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+    assert len(cache) == 2
+
+
+def test_byte_limit_evicts_until_it_fits():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("c", b"x" * 4)
+    assert "a" not in cache and len(cache) == 2
+    assert cache.size == 8
+
+
+def test_newest_entry_stays_even_when_too_big():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("big", b"x" * 50)
+    assert list(cache._entries) == ["big"]
+    assert cache.size == 50
+
+
+def test_replacing_an_entry_updates_its_size():
+    evicted = []
+    cache = ResultCache(on_evict=evicted.append)
+    cache.put("a", b"x" * 4)
+    cache.put("a", b"x" * 4)
+    assert evicted == []
+    cache.put("a", b"y" * 6)
+    assert evicted == [b"x" * 4]
+    assert cache.size == 6 and len(cache) == 1
+
+
+@pytest.fixture
+def spilled(tmp_path):
+    def make(name, size):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+    return make
+
+
+def test_file_cache_deletes_evicted_files(spilled):
+    cache = ResultCache.for_files(max_entries=2, max_bytes=100)
+    first, second, third = spilled("a.xlsx", 10), spilled("b.xlsx", 20), spilled("c.xlsx", 30)
+    cache.put("a", first)
+    cache.put("b", second)
+    assert cache.size == 30
+    cache.put("c", third)
+    assert "a" not in cache
+    assert not os.path.exists(first)
+    assert cache.get("b") == second and cache.get("c") == third
+
+
+def test_file_cache_byte_limit_and_clear(spilled, tmp_path):
+    cache = ResultCache.for_files(max_bytes=50)
+    cache.put("a", spilled("a.xlsx", 30))
+    cache.put("b", spilled("b.xlsx", 30))
+    assert list(cache._entries) == ["b"]
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_cache_ignores_files_already_gone(spilled):
+    cache = ResultCache.for_files(max_entries=1)
+    first = spilled("a.xlsx", 1)
+    cache.put("a", first)
+    os.remove(first)
+    cache.put("b", spilled("b.xlsx", 1))
+    assert "a" not in cache
@@ -0,0 +1,88 @@
+"""Whole-workbook output compared against checked-in golden dumps.
+
+Each dump lists every sheet's cells (value, fill, bold, font colour and
+number format), column widths and conditional formats. After an intended
+output change, regenerate them with
+``SMW_BULK_UPDATE_GOLDEN=1 python -m pytest tests/test_golden.py`` and
+review the diff.
+"""
+import json
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from smw_bulk.engine import process_manifest
+from smw_bulk.synthetic import COLUMNS, synthetic_manifest, write_manifest
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "golden")
+UPDATE = os.environ.get("SMW_BULK_UPDATE_GOLDEN") == "1"
+
+
+def edge_manifest():
+    """Small manifest with the awkward cases seen in vendor files."""
+    rows = [
+        # Carton, PO, UPC, Qty, Color, dimensions
+        ("0012345", "PO1000000000001A", "000123456789", "5", "Red", ("12", "10", "8", "6")),
+        ("0012345", "PO1000000000001B", "000123456789", "3", "Red", ("12", "10", "8", "6")),
+        ("0012346", "PO1000000000001D", "000987654321", "x", None, (None, "0", " ", "6")),
+        ("0012347", "PO1000000000001d", None, "2", "Blue", ("7.5", "10", "8", "6")),
+        (None, "PO1000000000002", "012345678905", "", "Café ✓", ("1", "1", "1", "1")),
+        (None, "PO1000000000002", "012345678905", "4", "Red", ("1", "1", "1", "1")),
+        ("0000001", "PO100000000000312", "000000000001", "10", "Red", ("3", "3", "3", "3")),
+        ("0000002", "PO100000000000345", "000000000001", "1", "Red", ("0", "0", "0", "0")),
+        ("0000003", None, "000000000002", "1", "Red", ("2", "2", "2", "2")),
+        ("0000004", "   ", "000000000002", "1", "Red", ("2", "2", "2", "2")),
+    ]
+    records = []
+    for i, (carton, po, upc, qty, color, dims) in enumerate(rows):
+        description = "A very long description that is wider than fifty characters" if i == 0 else "Item"
+        records.append([carton, f"SKU-{i:03d}", po, upc, description, qty, color, "M", "S1",
+                        "Dallas", *dims, None])
+    return pd.DataFrame(records, columns=COLUMNS, dtype=object)
+
+
+MANIFESTS = {
+    "synthetic": lambda: synthetic_manifest(rows=60, pos=4, boxes_per_po=5, upcs=6,
+                                            bad_dimension_rate=0.1, seed=7),
+    "edge": edge_manifest,
+}
+
+
+def dump(path):
+    """JSON-ready lines describing the workbook at ``path``."""
+    wb = openpyxl.load_workbook(path)
+    lines = []
+    for ws in wb.worksheets:
+        tab = ws.sheet_properties.tabColor
+        lines.append(["SHEET", ws.title, tab.rgb if tab is not None else None])
+        for row in ws.iter_rows():
+            for c in row:
+                if c.value is None and not c.has_style:
+                    continue
+                color = c.font.color.rgb if c.font.color is not None else None
+                lines.append([c.coordinate, c.value, c.fill.fgColor.rgb, bool(c.font.b),
+                              color if isinstance(color, str) else None, c.number_format])
+        for key, dim in sorted(ws.column_dimensions.items()):
+            lines.append(["WIDTH", key, dim.width])
+        for cf in ws.conditional_formatting:
+            lines.append(["CF", str(cf.sqref), [r.formula for r in cf.rules]])
+    return lines
+
+
+@pytest.mark.parametrize("name", sorted(MANIFESTS))
+def test_workbook_matches_golden(tmp_path, name):
+    source = write_manifest(MANIFESTS[name](), str(tmp_path / f"{name}.xlsx"))
+    output = process_manifest(source, str(tmp_path / "out.xlsx"))
+    lines = json.loads(json.dumps(dump(output)))
+
+    golden = os.path.join(GOLDEN, f"{name}.json")
+    if UPDATE:
+        os.makedirs(GOLDEN, exist_ok=True)
+        with open(golden, "w", encoding="utf-8") as fh:
+            fh.write("[\n" + ",\n".join(json.dumps(line, ensure_ascii=False) for line in lines)
+                     + "\n]\n")
+    with open(golden, encoding="utf-8") as fh:
+        expected = json.load(fh)
+    assert lines == expected
@@ -0,0 +1,158 @@
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from smw_bulk.autofit import MISSING_LENGTH, grouped_max_lengths, text_lengths
+from smw_bulk.engine import partition_groups
+from smw_bulk.layout import SheetPlan, team_style
+from smw_bulk.pivot import UpcBoxPivots, box_numbers
+from smw_bulk.render import WorkbookRenderer
+from smw_bulk.validation import group_keys, missing_po_letters
+
+
+def manifest(rows):
+    """Frame of ``(carton, po, upc, qty)`` rows in manifest column order."""
+    cartons, pos, upcs, qtys = zip(*rows)
+    return pd.DataFrame({"Carton No": cartons, "SKU": "SKU", "PO Number": pos,
+                         "UPC": upcs, "Qty": qtys}, dtype=object)
+
+
+def groups_of(df):
+    order, offsets, _ = partition_groups(df)
+    return {g: order[start:stop].tolist() for g, (start, stop) in offsets.items()}
+
+
+def test_partition_groups_by_first_15_characters_then_shipment():
+    df = manifest([
+        ("c1", "PO2000000000000B", "u", "1"),
+        ("c2", "PO1000000000000", "u", "1"),
+        ("c3", "PO2000000000000A", "u", "1"),
+        ("c4", "PO2000000000000B", "u", "1"),
+        ("c5", "PO10000000000001", "u", "1"),
+    ])
+    _, offsets, group_to_full_po = partition_groups(df)
+    assert list(offsets) == ["PO1000000000000", "PO2000000000000"]
+    assert groups_of(df) == {"PO1000000000000": [1, 4], "PO2000000000000": [2, 0, 3]}
+    assert group_to_full_po == {"PO1000000000000": "PO1000000000000",
+                                "PO2000000000000": "PO2000000000000B"}
+
+
+def test_partition_groups_of_empty_manifest():
+    order, offsets, group_to_full_po = partition_groups(manifest([("c", "PO1", "u", "1")]).iloc[:0])
+    assert len(order) == 0 and offsets == {} and group_to_full_po == {}
+
+
+def test_box_numbers_follow_first_appearance_within_each_group():
+    cartons = pd.Series(["c9", "c1", "c9", "c2", "c1", "c1", "c7"], dtype=object)
+    boxes = box_numbers(cartons, [(0, 5), (5, 7)])
+    assert boxes.tolist() == [1, 2, 1, 3, 2, 1, 2]
+
+
+def test_box_numbers_in_input_order_and_missing_cartons():
+    cartons = pd.Series(["c1", None, "c2", "c1", None], dtype=object)
+    order = np.array([4, 1, 3, 0, 2])
+    boxes = box_numbers(cartons, [(0, 3), (3, 5)], order)
+    # Sorted cartons: None, None, c1 | c1, c2; missing cartons share one Box#.
+    assert boxes.tolist() == [1, 1, 2, 1, 2]
+
+
+def test_box_numbers_leave_rows_outside_the_groups_at_zero():
+    cartons = pd.Series(["c1", "c2", "c3"], dtype=object)
+    assert box_numbers(cartons, [(0, 2)]).tolist() == [1, 2, 0]
+    assert box_numbers(cartons, []).tolist() == [0, 0, 0]
+
+
+def letter_gaps(pos):
+    po = pd.Series(pos, dtype=object)
+    return missing_po_letters(po, group_keys(po))
+
+
+def test_missing_po_letters_reports_each_skipped_letter():
+    assert letter_gaps(["PO1000000000001A", "PO1000000000001B", "PO1000000000001D"]) == \
+        {"PO1000000000001": ["C"]}
+    assert letter_gaps(["PO1000000000001A", "PO1000000000001E"]) == \
+        {"PO1000000000001": ["B", "C", "D"]}
+
+
+def test_missing_po_letters_ignores_complete_and_unstarted_runs():
+    assert letter_gaps(["PO1000000000001A", "PO1000000000001B", "PO1000000000001b"]) == {}
+    assert letter_gaps(["PO1000000000001B", "PO1000000000001D"]) == {}
+    assert letter_gaps(["PO1000000000001", "PO1000000000001A"]) == {}
+
+
+def test_missing_po_letters_are_per_group_and_case_insensitive():
+    gaps = letter_gaps([
+        "PO1000000000001a", "PO1000000000001c",
+        "PO2000000000002A", "PO2000000000002B",
+        None, "  ",
+    ])
+    assert gaps == {"PO1000000000001": ["B"]}
+
+
+def test_pivots_sum_quantities_per_upc_and_box():
+    df = manifest([
+        ("c1", "PO1000000000001", "u1", "2"),
+        ("c2", "PO1000000000002", "u1", "5"),
+        ("c1", "PO1000000000001", "u1", "3"),
+        ("c1", "PO1000000000001", "u2", "x"),
+        ("c3", "PO1000000000001", "u2", "4"),
+        ("c4", "PO1000000000001", None, "9"),
+        ("c5", "PO1000000000003", None, "1"),
+    ])
+    order, offsets, _ = partition_groups(df)
+    pivots = UpcBoxPivots.of_frame(df, offsets, order=order)
+
+    first = pivots.for_group("PO1000000000001")
+    assert first.upcs == ["u1", "u2"] and first.boxes == [1, 2]
+    assert first.rows() == [[5, ""], ["", 4]]
+    assert first.row_totals().tolist() == [5, 4]
+    assert first.column_totals().tolist() == [5, 4]
+    assert first.grand_total() == 9
+    assert first.to_frame().loc["u2", 2] == 4
+
+    assert pivots.for_group("PO1000000000002").rows() == [[5]]
+    assert "PO1000000000003" not in pivots
+    assert pivots.for_group("PO1000000000003").shape == (0, 0)
+
+
+def test_pivots_need_upc_and_quantity_columns():
+    df = manifest([("c1", "PO1000000000001", "u1", "2")]).drop(columns="Qty")
+    _, offsets, _ = partition_groups(df)
+    assert UpcBoxPivots.of_frame(df, offsets) is None
+
+
+def test_text_lengths_measure_missing_values_as_nan():
+    frame = pd.DataFrame({"a": ["x", None, "long text"], "b": ["0012", "", "é"]}, dtype=object)
+    assert text_lengths(frame).tolist() == [[1, 4], [MISSING_LENGTH, 0], [9, 1]]
+
+
+def test_grouped_max_lengths_per_range():
+    lengths = np.array([[1, 5], [3, 2], [2, 2], [7, 1], [0, 0]])
+    assert grouped_max_lengths(lengths, [(0, 2), (2, 4)]) == [[3, 5], [7, 2]]
+    assert grouped_max_lengths(lengths, []) == []
+
+
+def test_renderer_keeps_reserved_tab_order_and_shares_formats():
+    first, second = SheetPlan("First"), SheetPlan("Second")
+    first.write_row(0, 0, ["a", "b"], "header")
+    first.set_column(0, 1, 12)
+    second.write_row(0, 0, ["c"], team_style("JB"))
+    second.write_row(1, 0, ["d"], "text")
+
+    buffer = io.BytesIO()
+    renderer = WorkbookRenderer(buffer)
+    renderer.reserve("Second")
+    renderer.render(first)
+    renderer.render(second)
+    # "text" and an uncoloured person share one format.
+    assert renderer.formats[team_style("nobody")] is renderer.formats["text"]
+    assert len(renderer.formats) == 3
+    renderer.close()
+
+    wb = openpyxl.load_workbook(io.BytesIO(buffer.getvalue()))
+    assert wb.sheetnames == ["Second", "First"]
+    assert wb["First"]["B1"].value == "b" and wb["First"]["A1"].font.b
+    assert wb["First"].column_dimensions["A"].width > 12
+    assert wb["Second"]["A1"].fill.fgColor.rgb == "FF90EE90"
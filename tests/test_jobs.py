@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from smw_bulk.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobRunner
+
+TIMEOUT = 10
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(workers=1)
+    yield runner
+    runner.shutdown()
+
+
+def blocking(gate, started=None):
+    """Work that waits for ``gate``, reporting progress while it waits."""
+    def work(on_progress):
+        if started is not None:
+            started.set()
+        n = 0
+        while not gate.wait(0.01):
+            n += 1
+            on_progress(n, n + 1)
+        return "done"
+    return work
+
+
+def test_runs_work_and_keeps_result(runner):
+    def work(x, on_progress):
+        on_progress(1, 2, "half", "first line")
+        on_progress(2, 2, message="second line")
+        return x * 2
+
+    job = runner.submit("k", work, 21, label="answer")
+    assert job.wait(TIMEOUT)
+    assert job.state == DONE
+    assert job.result == 42
+    assert job.fraction == 1.0
+    assert job.text == "half"
+    assert job.messages == ["first line", "second line"]
+
+
+def test_same_key_joins_the_running_job(runner):
+    calls = []
+    gate = threading.Event()
+
+    def work(on_progress):
+        calls.append(1)
+        gate.wait(TIMEOUT)
+        return len(calls)
+
+    first = runner.submit("k", work, subscriber="a")
+    second = runner.submit("k", work, subscriber="b")
+    assert second is first
+    assert first.subscribers == {"a", "b"}
+    gate.set()
+    assert first.wait(TIMEOUT)
+    assert calls == [1]
+
+    assert runner.submit("k", work) is first  # done jobs are reused too
+
+
+def test_failed_job_is_resubmitted(runner):
+    def fail(on_progress):
+        raise RuntimeError("boom")
+
+    job = runner.submit("k", fail)
+    assert job.wait(TIMEOUT)
+    assert job.state == FAILED
+    assert str(job.error) == "boom"
+
+    retry = runner.submit("k", lambda on_progress: "ok")
+    assert retry is not job
+    assert retry.wait(TIMEOUT)
+    assert retry.result == "ok"
+
+
+def test_cancel_running_job_stops_at_next_report(runner):
+    gate, started = threading.Event(), threading.Event()
+    job = runner.submit("k", blocking(gate, started))
+    assert started.wait(TIMEOUT)
+    assert job.state == RUNNING
+    assert runner.cancel(job)
+    assert job.wait(TIMEOUT)
+    assert job.state == CANCELLED
+    assert job.result is None
+
+
+def test_cancel_queued_job_never_runs(runner):
+    gate, started = threading.Event(), threading.Event()
+    first = runner.submit("first", blocking(gate, started))
+    assert started.wait(TIMEOUT)
+
+    ran = []
+    queued = runner.submit("second", lambda on_progress: ran.append(1))
+    assert queued.state == QUEUED
+    assert runner.ahead_of(queued) == 1
+    assert runner.cancel(queued)
+    assert queued.state == CANCELLED
+
+    gate.set()
+    assert first.wait(TIMEOUT)
+    assert ran == []
+
+    again = runner.submit("second", lambda on_progress: "ran")
+    assert again is not queued
+    assert again.wait(TIMEOUT)
+    assert again.result == "ran"
+
+
+def test_cancel_waits_for_the_last_subscriber(runner):
+    gate, started = threading.Event(), threading.Event()
+    job = runner.submit("k", blocking(gate, started), subscriber="a")
+    runner.submit("k", blocking(gate), subscriber="b")
+    assert started.wait(TIMEOUT)
+
+    assert not runner.cancel(job, "a")
+    assert not job.cancelled
+    assert runner.cancel(job, "b")
+    assert job.wait(TIMEOUT)
+    assert job.state == CANCELLED
+
+
+def test_cancel_finished_job_is_a_no_op(runner):
+    job = runner.submit("k", lambda on_progress: 1)
+    assert job.wait(TIMEOUT)
+    assert not runner.cancel(job)
+    assert job.state == DONE
+
+
+def test_forget_and_trim_finished_jobs():
+    runner = JobRunner(workers=1, keep=2)
+    try:
+        jobs = [runner.submit(i, lambda on_progress: None) for i in range(4)]
+        for job in jobs:
+            assert job.wait(TIMEOUT)
+        runner._trim()
+        assert len(runner) == 2
+        assert runner.get(0) is None and runner.get(3) is jobs[3]
+
+        runner.forget(jobs[3])
+        assert runner.get(3) is None
+    finally:
+        runner.shutdown()
+
+
+def test_shutdown_cancels_unfinished_jobs():
+    runner = JobRunner(workers=1)
+    gate, started = threading.Event(), threading.Event()
+    running = runner.submit("a", blocking(gate, started))
+    queued = runner.submit("b", blocking(gate))
+    assert started.wait(TIMEOUT)
+    runner.shutdown()
+    assert running.state == CANCELLED
+    assert queued.state == CANCELLED
@@ -0,0 +1,71 @@
+import io
+import logging
+import threading
+
+from smw_bulk import metrics as metrics_module
+from smw_bulk.metrics import RunMetrics, enable_logging
+
+
+def test_stage_records_memory_change(monkeypatch):
+    readings = iter([100.0, 130.0, 130.0, 110.0])
+    monkeypatch.setattr(metrics_module, "rss_mb", lambda: next(readings))
+    monkeypatch.setattr(metrics_module, "max_rss_mb", lambda: 500.0)
+    monkeypatch.setattr(metrics_module, "SAMPLE_SECONDS", 60)
+    metrics = RunMetrics()
+    with metrics.stage("read"):
+        pass
+    with metrics.stage("read"):
+        pass
+    entry = metrics.stages["read"]
+    assert entry["rss_mb"] == 110.0
+    assert entry["rss_delta_mb"] == 10.0
+    assert entry["peak_rss_mb"] == 130.0
+
+
+def test_stage_peak_catches_memory_freed_before_it_ends(monkeypatch):
+    rss = [100.0]
+    sampled = threading.Event()
+
+    def reading():
+        if rss[0] > 100:
+            sampled.set()
+        return rss[0]
+
+    monkeypatch.setattr(metrics_module, "rss_mb", reading)
+    monkeypatch.setattr(metrics_module, "max_rss_mb", lambda: 500.0)
+    monkeypatch.setattr(metrics_module, "SAMPLE_SECONDS", 0.001)
+    metrics = RunMetrics()
+    with metrics.stage("pivot"):
+        rss[0] = 400.0
+        assert sampled.wait(5)
+        rss[0] = 120.0
+    entry = metrics.stages["pivot"]
+    assert entry["rss_delta_mb"] == 20.0
+    assert entry["peak_rss_mb"] == 400.0
+
+
+def test_stage_peak_uses_lifetime_peak_growth(monkeypatch):
+    peaks = iter([200.0, 350.0])
+    monkeypatch.setattr(metrics_module, "rss_mb", lambda: None)
+    monkeypatch.setattr(metrics_module, "max_rss_mb", lambda: next(peaks))
+    metrics = RunMetrics()
+    with metrics.stage("write"):
+        pass
+    assert metrics.stages["write"]["peak_rss_mb"] == 350.0
+
+
+def test_enable_logging_emits_one_line_per_run(monkeypatch):
+    logger = logging.getLogger("smw_bulk.metrics")
+    monkeypatch.setattr(logger, "handlers", [])
+    monkeypatch.setattr(logger, "propagate", False)
+    monkeypatch.setattr(logger, "level", logger.level)
+    stream = io.StringIO()
+    enable_logging(stream)
+    enable_logging(stream)
+
+    metrics = RunMetrics()
+    metrics.finish()
+    metrics.log(rows=3)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert '"rows": 3' in lines[0]
@@ -0,0 +1,79 @@
+import io
+
+import pandas as pd
+import pytest
+
+from smw_bulk import readers
+from smw_bulk.engine import process_manifest, validate_manifest
+from smw_bulk.readers import ManifestError, read_header, read_table
+from smw_bulk.synthetic import write_manifest
+
+ENGINES = ["openpyxl", pytest.param("calamine", marks=pytest.mark.skipif(
+    readers.xlsx_engine() != "calamine", reason="python-calamine not installed"))]
+
+
+def named(data, name):
+    source = io.BytesIO(data)
+    source.name = name
+    return source
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("data", [b"PK\x03\x04 truncated", b"not a workbook"])
+def test_damaged_xlsx(monkeypatch, engine, data):
+    monkeypatch.setattr(readers, "xlsx_engine", lambda: engine)
+    with pytest.raises(ManifestError, match="Excel workbook"):
+        read_table(named(data, "manifest.xlsx"))
+    with pytest.raises(ManifestError):
+        read_header(named(data, "manifest.xlsx"))
+
+
+@pytest.mark.parametrize("data, match", [
+    (b'a,b,c\n1,2,3\n4,5,6,7,8\n', "CSV file"),
+    (b'a,b,c\n"1,2\n', "CSV file"),
+    (b"a,b,c\n\xff\xfe\xe9,2,3\n", "not UTF-8"),
+    (b"", "CSV file"),
+])
+def test_malformed_csv(data, match):
+    with pytest.raises(ManifestError, match=match):
+        read_table(named(data, "manifest.csv"))
+
+
+def test_damaged_parquet():
+    with pytest.raises(ManifestError, match="Parquet file"):
+        read_table(named(b"PAR1 garbage", "manifest.parquet"))
+
+
+def test_engine_entry_points_report_manifest_errors():
+    with pytest.raises(ManifestError):
+        process_manifest(named(b"PK\x03\x04 truncated", "manifest.xlsx"))
+    with pytest.raises(ManifestError):
+        validate_manifest(named(b"a,b,c\n\xff,2,3\n", "manifest.csv"))
+
+
+@pytest.fixture
+def zero_padded():
+    return pd.DataFrame({
+        "Carton No": ["000010000118", "000010000125"],
+        "SKU": ["SKU-1", "SKU-2"],
+        "PO Number": ["PO0000000001A", "PO0000000001B"],
+        "UPC": ["010000000144", "001234"],
+        "Qty": ["7", "24"],
+    })
+
+
+@pytest.mark.parametrize("fmt, engine", [
+    ("xlsx", "openpyxl"),
+    pytest.param("xlsx", "calamine", marks=pytest.mark.skipif(
+        readers.xlsx_engine() != "calamine", reason="python-calamine not installed")),
+    ("csv", None),
+    ("parquet", None),
+])
+def test_leading_zeros_survive(tmp_path, monkeypatch, zero_padded, fmt, engine):
+    if engine is not None:
+        monkeypatch.setattr(readers, "xlsx_engine", lambda: engine)
+    path = write_manifest(zero_padded, str(tmp_path / f"manifest.{fmt}"))
+    df = read_table(path)
+    assert df["Carton No"].tolist() == zero_padded["Carton No"].tolist()
+    assert df["UPC"].tolist() == zero_padded["UPC"].tolist()
+    assert df["PO Number"].tolist() == zero_padded["PO Number"].tolist()
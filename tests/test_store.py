@@ -0,0 +1,169 @@
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from smw_bulk import store as store_module
+from smw_bulk.batch import process_batch
+from smw_bulk.engine import process_manifest, process_po_number
+from smw_bulk.metrics import RunMetrics
+from smw_bulk.store import GroupStore
+from smw_bulk.synthetic import synthetic_manifest, write_manifest
+
+
+def run(df, store):
+    metrics = RunMetrics()
+    summary = []
+    process_manifest(df, store=store, metrics=metrics, summary=summary)
+    reused = {name for name, figures in metrics.groups.items() if figures["reused"]}
+    return reused, set(metrics.groups), {row["PO Number"]: row["Assigned to"] for row in summary}
+
+
+def xlsx_bytes(df, path):
+    with open(write_manifest(df, str(path)), "rb") as fh:
+        return fh.read()
+
+
+@pytest.fixture
+def manifest():
+    return synthetic_manifest(rows=300, pos=12, seed=1)
+
+
+def test_unchanged_manifest_reuses_every_sheet(tmp_path, manifest):
+    store = GroupStore(str(tmp_path / "store"))
+    reused, sheets, _ = run(manifest, store)
+    assert not reused
+    reused, again, _ = run(manifest, store)
+    assert again == sheets
+    assert reused == sheets
+
+
+def test_changed_rows_rebuild_only_their_po(tmp_path, manifest):
+    store = GroupStore(str(tmp_path / "store"))
+    _, sheets, _ = run(manifest, store)
+
+    revised = manifest.copy()
+    revised.iloc[0, 5] = "999"
+    reused, _, _ = run(revised, store)
+    rebuilt = sheets - reused
+    assert rebuilt == {process_po_number(revised.iloc[0, 2])[:31]}
+
+
+def test_store_version_invalidates_entries(tmp_path, manifest, monkeypatch):
+    store = GroupStore(str(tmp_path / "store"))
+    run(manifest, store)
+    monkeypatch.setattr(store_module, "STORE_VERSION", store_module.STORE_VERSION + 1)
+    reused, _, _ = run(manifest, store)
+    assert not reused
+
+
+def test_known_pos_keep_their_person(tmp_path, manifest):
+    store = GroupStore(str(tmp_path / "store"))
+    _, _, first = run(manifest, store)
+    extra = manifest.iloc[:5].copy()
+    extra.iloc[:, 2] = "PO9999999999999A"
+    _, _, second = run(pd.concat([manifest, extra], ignore_index=True), store)
+    for po, person in first.items():
+        assert second[po] == person
+    assert process_po_number("PO9999999999999A") in second
+
+
+def test_refuses_directory_writable_by_others(tmp_path):
+    if not hasattr(os, "getuid"):
+        pytest.skip("POSIX permissions only")
+    root = tmp_path / "shared"
+    root.mkdir()
+    os.chmod(root, 0o777)
+    with pytest.raises(PermissionError):
+        GroupStore(str(root))
+
+
+def test_refuses_directory_owned_by_someone_else(tmp_path):
+    if not hasattr(os, "getuid") or os.getuid() != 0:
+        pytest.skip("needs root to hand the directory to another user")
+    root = tmp_path / "foreign"
+    root.mkdir(mode=0o700)
+    os.chown(root, 12345, 12345)
+    with pytest.raises(PermissionError):
+        GroupStore(str(root))
+
+
+def test_new_store_is_private(tmp_path):
+    if not hasattr(os, "getuid"):
+        pytest.skip("POSIX permissions only")
+    root = tmp_path / "store"
+    GroupStore(str(root))
+    assert os.stat(root).st_mode & 0o077 == 0
+
+
+def test_prune_drops_old_then_least_recently_used(tmp_path):
+    store = GroupStore(str(tmp_path / "store"), max_age=3600, max_bytes=10_000)
+    for key in ("aa01", "bb02", "cc03"):
+        store.put(key, b"x" * 4000)
+    now = time.time()
+    os.utime(store._path("aa01"), (now - 7200, now - 7200))
+    os.utime(store._path("bb02"), (now - 60, now - 60))
+
+    assert store.prune() == 1
+    assert "aa01" not in store
+    assert "bb02" in store and "cc03" in store
+
+    store.put("dd04", b"x" * 4000)
+    assert store.prune() == 1
+    assert "bb02" not in store
+    assert "cc03" in store and "dd04" in store
+
+
+def test_get_marks_entry_as_used(tmp_path):
+    store = GroupStore(str(tmp_path / "store"), max_age=3600)
+    store.put("aa01", ("plan", 1))
+    old = time.time() - 7200
+    os.utime(store._path("aa01"), (old, old))
+    assert store.get("aa01") == ("plan", 1)
+    assert store.prune() == 0
+
+
+def test_assignments_expire(tmp_path, monkeypatch):
+    store = GroupStore(str(tmp_path / "store"), max_age=3600)
+    store.save_assignments({"PO1": "JB"})
+    later = time.time() + 7200
+    monkeypatch.setattr(store_module.time, "time", lambda: later)
+    store.save_assignments({"PO2": "Paulo"})
+    assert store.assignments() == {"PO2": "Paulo"}
+
+
+def test_concurrent_saves_keep_every_assignment(tmp_path):
+    store = GroupStore(str(tmp_path / "store"))
+
+    def save(n):
+        for i in range(20):
+            store.save_assignments({f"PO{n}-{i}": f"person{n}"})
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store.assignments()) == 80
+
+
+def test_store_survives_pickling(tmp_path):
+    store = GroupStore(str(tmp_path / "store"), max_age=60)
+    store.put("aa01", ("plan", 1))
+    copy = pickle.loads(pickle.dumps(store))
+    assert copy.root == store.root and copy.max_age == 60
+    assert copy.get("aa01") == ("plan", 1)
+    copy.save_assignments({"PO1": "JB"})
+    assert store.assignments() == {"PO1": "JB"}
+
+
+def test_batch_with_process_pool_shares_the_store(tmp_path, manifest):
+    files = [("a.xlsx", xlsx_bytes(manifest, tmp_path / "a.xlsx")),
+             ("b.xlsx", xlsx_bytes(manifest.iloc[:150], tmp_path / "b.xlsx"))]
+    result = process_batch(files, pool="process", workers=2,
+                           store=GroupStore(str(tmp_path / "store")))
+    assert not result.errors
+    assert sorted(result.files) == ["a.xlsx", "b.xlsx"]
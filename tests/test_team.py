@@ -0,0 +1,19 @@
+import pytest
+
+from smw_bulk.team import BALANCED, Roster
+
+
+@pytest.mark.parametrize("capacity", [0, -1, "x", None, float("nan")])
+def test_capacity_must_be_positive(capacity):
+    config = {"members": [{"name": "A", "capacity": capacity}, {"name": "B"}]}
+    with pytest.raises(ValueError):
+        Roster.from_dict(config, BALANCED)
+
+
+def test_balanced_assignment_follows_capacity():
+    roster = Roster.from_dict({"members": [{"name": "A", "capacity": 3}, {"name": "B"}]},
+                              BALANCED)
+    pos = [f"PO{i}" for i in range(8)]
+    assignments = roster.assign(pos, {po: 1.0 for po in pos})
+    assert assignments.count("A") == 6
+    assert assignments.count("B") == 2
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from smw_bulk.engine import partition_groups
+from smw_bulk.synthetic import synthetic_manifest
+from smw_bulk.validation import blank_po, group_keys, validation_report
+
+
+def test_blank_pos_have_no_group_key():
+    po = pd.Series(["PO1000000000001A", None, np.nan, "", "   ", "PO1000000000002"], dtype=object)
+    assert blank_po(po).tolist() == [False, True, True, True, True, False]
+    keys = group_keys(po)
+    assert keys.isna().tolist() == [False, True, True, True, True, False]
+    assert keys[0] == "PO1000000000001"
+
+
+def test_rows_without_po_are_left_out_and_reported():
+    df = synthetic_manifest(rows=200, pos=8, seed=3)
+    df.iloc[[4, 9], 2] = None
+    df.iloc[17, 2] = " "
+    order, offsets, group_to_full_po = partition_groups(df)
+    grouped = np.concatenate([order[start:stop] for start, stop in offsets.values()])
+    assert len(grouped) == len(df) - 3
+    assert not {4, 9, 17} & set(grouped.tolist())
+    assert "nan" not in offsets and " " not in group_to_full_po
+
+    report = validation_report(df.iloc[:, 2], df.iloc[:, 10:14])
+    assert report["rows_without_po"] == [6, 11, 19]
+    assert not report["ok"]
+    assert sum(g["rows"] for g in report["details"]) == len(df) - 3